@@ -0,0 +1,268 @@
+"""基准测试夹具：按 references/data-schema.md 生成全部数据文件，规模可调。
+
+同一组 sizes + seed 生成的数据完全一致，基线之间才有可比性。
+build() 返回 {相对路径: JSON 对象}，路径与 https://hhxg.top/static/data/ 下一致。
+"""
+from __future__ import annotations
+
+import datetime
+import random
+
+# 预设规模；命令行可用 --ladder=N 等单独覆盖
+SCALES = {
+    "small": {"ladder": 10, "seats": 1, "news": 20, "themes": 5, "sectors": 5, "margin_top": 10, "events": 4},
+    "medium": {"ladder": 300, "seats": 20, "news": 2000, "themes": 20, "sectors": 20, "margin_top": 50, "events": 30},
+    "large": {"ladder": 5000, "seats": 100, "news": 50000, "themes": 60, "sectors": 60, "margin_top": 200, "events": 200},
+}
+SIZE_KEYS = tuple(SCALES["small"])
+
+_NAME_CHARS = "中华国科技新能源电子智能数据云海天宏信达通安华泰光明金融证券汽车医药生物材料"
+_CATS = ("宏观", "公司", "市场", "行业", "海外")
+_INDUSTRIES = ("半导体", "军工", "银行", "地产", "电子", "医药", "汽车", "电力", "有色", "传媒")
+_AREAS = ("广东", "江苏", "浙江", "上海", "北京", "四川", "山东", "福建")
+_CONCEPTS = ("AI算力", "机器人", "低空经济", "固态电池", "国产替代", "数据要素")
+
+
+def sizes_for(scale="small", **overrides):
+    """预设规模叠加单项覆盖，未知预设抛 KeyError。"""
+    sizes = dict(SCALES[scale])
+    for key, value in overrides.items():
+        if value is not None:
+            sizes[key] = int(value)
+    return sizes
+
+
+def build(sizes, today=None, seed=0):
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    files = {
+        "assistant/skill_snapshot.json": _snapshot(rng, sizes, today),
+        "assistant/recent_margin_7d.json": _margin(rng, sizes, today),
+        "news/n0.json": _news(rng, sizes["news"], today),
+    }
+    for year in (today.year - 1, today.year, today.year + 1):
+        files.update(_calendar(rng, sizes["events"], year))
+    return files
+
+
+def _name(rng, n=4):
+    return "".join(rng.choice(_NAME_CHARS) for _ in range(n))
+
+
+def _yi(rng, scale=10.0):
+    return round(rng.uniform(-scale, scale), 2)
+
+
+def _stock(rng, i):
+    return {
+        "name": _name(rng),
+        "code": "%06d" % (600000 + i if i % 2 else i + 1),
+        "industry": rng.choice(_INDUSTRIES),
+        "area": rng.choice(_AREAS),
+        "concept": rng.choice(_CONCEPTS),
+    }
+
+
+def _ladder(rng, n):
+    """n 只涨停股按连板数分层，板数越高人数越少。"""
+    levels = {}
+    for i in range(n):
+        boards = min(1 + int(rng.expovariate(1.2)), 12)
+        stock = _stock(rng, i)
+        if rng.random() < 0.15:
+            stock["is_success"] = False
+        levels.setdefault(boards, []).append(stock)
+    area_counts, concept_counts = {}, {}
+    for stocks in levels.values():
+        for s in stocks:
+            area_counts[s["area"]] = area_counts.get(s["area"], 0) + 1
+            concept_counts[s["concept"]] = concept_counts.get(s["concept"], 0) + 1
+    top = levels[max(levels)][0] if levels else {}
+    ladder = {
+        "total_limit_up": n,
+        "max_streak": max(levels) if levels else 0,
+        "top_streak": {k: top[k] for k in ("name", "code", "industry")} if top else {},
+    }
+    detail = {
+        "levels": [
+            {
+                "boards": boards,
+                "count": len(stocks),
+                "fail_count": sum(1 for s in stocks if s.get("is_success") is False),
+                "stocks": stocks,
+            }
+            for boards, stocks in sorted(levels.items(), reverse=True)
+        ],
+        "lb_rates_map": {str(b): "%.1f%%" % rng.uniform(5, 80) for b in levels},
+        "area_counts": area_counts,
+        "concept_counts": concept_counts,
+    }
+    return ladder, detail
+
+
+def _news(rng, n, today):
+    """n 条快讯，按时间倒序，每分钟约一条，跨多天。"""
+    start = datetime.datetime.combine(today, datetime.time(23, 59))
+    items = []
+    for i in range(n):
+        t = start - datetime.timedelta(minutes=i)
+        items.append({
+            "t": t.isoformat(),
+            "cat": rng.choice(_CATS),
+            "title": "%s%s：%s" % (_name(rng, 2), rng.choice(_INDUSTRIES), _name(rng, 12)),
+        })
+    return items
+
+
+def _snapshot(rng, sizes, today):
+    date = today.isoformat()
+    ladder, detail = _ladder(rng, sizes["ladder"])
+    limit_up = sizes["ladder"]
+    news = _news(rng, 10, today)
+    return {
+        "meta": {"schema_version": 3, "generated_at": date + "T20:01:00"},
+        "date": date,
+        "disclaimer": "数据仅供参考，不构成投资建议",
+        "ai_summary": {
+            "market_state": "震荡分化，" + _name(rng, 8),
+            "focus_direction": "资金流向" + rng.choice(_INDUSTRIES),
+            "theme_focus": rng.choice(_CONCEPTS),
+            "hotmoney_state": "游资活跃度" + rng.choice(("上升", "持平", "回落")),
+            "news_highlight": news[0]["title"],
+            "cta": "查看完整日报",
+        },
+        "market": {
+            "date": date,
+            "sentiment_index": round(rng.uniform(0, 100), 1),
+            "sentiment_label": rng.choice(("强", "中", "弱")),
+            "limit_up": limit_up,
+            "fried": rng.randint(0, max(1, limit_up // 4)),
+            "limit_down": rng.randint(0, 50),
+            "struct_diff": round(rng.uniform(-5, 5), 2),
+            "promotion_rate": "%.1f%%" % rng.uniform(5, 60),
+            "total": 5300,
+            "buckets": [
+                {"name": name, "count": rng.randint(0, 2000), "prev": rng.randint(0, 2000),
+                 "dir": rng.choice(("up", "down", ""))}
+                for name in (">7%", "5~7%", "3~5%", "0~3%", "-3~0%", "-5~-3%", "-7~-5%", "<-7%")
+            ],
+        },
+        "comparison": {
+            "yesterday": {"limit_up": rng.randint(0, limit_up + 20), "sentiment_index": 50.0, "fried": 10},
+            "trend_label": "近7日高位区间",
+            "trend_url": "https://hhxg.top/trend",
+        },
+        "hot_themes": [
+            {
+                "name": _name(rng),
+                "limitup_count": rng.randint(1, 20),
+                "net_yi": _yi(rng, 30),
+                "top_stocks": [{"name": _name(rng), "net_yi": _yi(rng, 3)} for _ in range(5)],
+            }
+            for _ in range(sizes["themes"])
+        ],
+        "sectors": [
+            {
+                "label": label,
+                "strong": [_sector(rng) for _ in range(sizes["sectors"])],
+                "weak": [_sector(rng) for _ in range(sizes["sectors"])],
+            }
+            for label in ("行业", "概念")
+        ],
+        "ladder": ladder,
+        "ladder_detail": detail,
+        "hotmoney": {
+            "date": date,
+            "total_net_yi": _yi(rng, 50),
+            "top_net_buy": [
+                {"name": _name(rng), "net_yi": abs(_yi(rng, 5)), "ratio_pct": round(rng.uniform(1, 30), 1)}
+                for _ in range(10)
+            ],
+            "seats": [
+                {"name": _name(rng, 3), "stocks": [{"name": _name(rng), "net_yi": _yi(rng, 2)} for _ in range(rng.randint(1, 8))]}
+                for _ in range(sizes["seats"])
+            ],
+        },
+        "focus_news": news[:5],
+        "macro_news": news[5:],
+        "signals_count": {
+            "jiuzhuan": rng.randint(0, 30),
+            "multi_factor": rng.randint(0, 30),
+            "emotion_sync": rng.randint(0, 30),
+            "volatility_alert": rng.randint(0, 30),
+            "free_day": "每周一",
+            "xuangu_url": "https://hhxg.top/xuangu",
+            "backtest_url": "https://hhxg.top/backtest",
+        },
+        # 文档写的是 array，fmt_footer 实际按 {key: {title, url}} 读取，以代码为准
+        "links": {
+            "full_report": {"title": "完整日报", "url": "https://hhxg.top"},
+            "stock_picker": {"title": "选股工具", "url": "https://hhxg.top/xuangu"},
+            "margin": {"title": "融资融券", "url": "https://hhxg.top/margin"},
+        },
+    }
+
+
+def _sector(rng):
+    return {"name": _name(rng, 3), "net_yi": _yi(rng, 40), "leader": _name(rng), "bias_pct": _yi(rng, 5)}
+
+
+def _margin(rng, sizes, today):
+    days = [today - datetime.timedelta(days=i) for i in range(6, -1, -1)]
+
+    def top_item():
+        return {
+            "name": _name(rng),
+            "latest_rzye_yi": round(rng.uniform(1, 200), 2),
+            "delta_rzye_yi": _yi(rng, 10),
+            "delta_pct": _yi(rng, 8),
+        }
+
+    return {
+        "window": {"start": days[0].isoformat(), "end": days[-1].isoformat()},
+        "market": {
+            "daily_totals": [
+                {"date": d.isoformat(), "rzye_yi": round(18000 + rng.uniform(-300, 300), 2),
+                 "rqye_yi": round(100 + rng.uniform(-5, 5), 2)}
+                for d in days
+            ],
+            "delta_rzye_yi": _yi(rng, 300),
+            "delta_rqye_yi": _yi(rng, 5),
+        },
+        "top": {
+            "increase_rzye": [top_item() for _ in range(sizes["margin_top"])],
+            "decrease_rzye": [top_item() for _ in range(sizes["margin_top"])],
+        },
+    }
+
+
+def _calendar(rng, per_month, year):
+    files = {}
+    day = datetime.date(year, 1, 1)
+    trading = []
+    while day.year == year:
+        if day.weekday() < 5:
+            trading.append(day.isoformat())
+        day += datetime.timedelta(days=1)
+    files["calendar/trading_days_%d.json" % year] = trading
+    files["calendar/delivery_%d.json" % year] = {"events": [
+        {"date": "%d-%02d-15" % (year, m), "label": "股指期货交割日", "description": "IF/IH/IC/IM", "type": "delivery"}
+        for m in range(1, 13)
+    ]}
+    for m in range(1, 13):
+        files["calendar/unlock_%d%02d.json" % (year, m)] = {"events": [
+            {
+                "date": "%d-%02d-%02d" % (year, m, rng.randint(1, 28)),
+                "label": "%s 限售股解禁" % _name(rng),
+                "description": "解禁市值 %.1f 亿" % rng.uniform(1, 500),
+                "type": "unlock",
+                "top_companies": [{"name": _name(rng), "value": "%.1f亿" % rng.uniform(1, 100)} for _ in range(3)],
+            }
+            for _ in range(per_month)
+        ]}
+        files["calendar/earnings_%d%02d.json" % (year, m)] = {"events": [
+            {"date": "%d-%02d-%02d" % (year, m, rng.randint(1, 28)), "label": "%s 业绩预告" % _name(rng),
+             "description": rng.choice(("预增", "预减", "扭亏", "首亏")), "type": "earnings"}
+            for _ in range(per_month)
+        ]}
+    return files
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""性能基准：对本地替身服务（server.py）测量拉取、解码、格式化和命令行端到端耗时。
+
+每个用例跑 --runs 次（先空跑一次预热），记录中位数 / p90 / 最小值 / 失败次数，
+结果写成 JSON 基线，之后用 --compare 对比改动前后的差异。
+
+Usage:
+    python3 bench/run.py                              # small 规模，写 bench/baselines/small.json
+    python3 bench/run.py --scale=large --runs=10
+    python3 bench/run.py --ladder=5000 --seats=100 --news=50000 --out=/tmp/big.json
+    python3 bench/run.py --only=fetch,format          # 只跑部分阶段：fetch/decode/format/cli
+    python3 bench/run.py --compare=bench/baselines/small.json --threshold=20
+    python3 bench/run.py --latency=30 --error-rate=0.05 --no-save   # 故障注入，失败计入 errors
+
+阶段说明：
+    fetch    网络拉取 + 解码（不落缓存）、条件请求 304、命中本地缓存
+    decode   json.loads 原始响应体 vs 本地 .bin 快速加载（含按字段部分解码）
+    format   各脚本的文本格式化函数（快照另测 _models 解析及基于模型的格式化）
+    cli      子进程跑脚本：warm 为缓存已就绪，cold 为每次全新缓存目录
+
+替身服务在独立子进程中运行，不与被测代码争抢 GIL。
+脚本通过 HHXG_BASE_URL / HHXG_CACHE_DIR 指向替身服务和临时缓存，并关闭守护进程与归档。
+"""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.normpath(os.path.join(BENCH_DIR, os.pardir, "scripts"))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCH_DIR)
+import _common  # noqa: E402
+import _fixtures  # noqa: E402
+
+STAGES = ("fetch", "decode", "format", "cli")
+RUNS = 5
+THRESHOLD = 20          # --compare 时中位数变慢超过该百分比视为回退
+NOISE_MS = 0.05         # 低于该绝对差值的变化不计，避免微秒级用例误报
+
+# 数据集 -> (path, 脚本使用的 cache_name)
+DATASETS = {
+    "snapshot": ("assistant/skill_snapshot.json", "last.json"),
+    "margin": ("assistant/recent_margin_7d.json", "margin_7d.json"),
+    "news": ("news/n0.json", "news_latest.json"),
+}
+
+CLI_CASES = (
+    ("fetch_snapshot.py",),
+    ("fetch_snapshot.py", "summary"),
+    ("fetch_snapshot.py", "--json"),
+    ("margin.py",),
+    ("news.py", "20"),
+    ("news.py", "--jsonl"),
+    ("calendar.py",),
+    ("calendar.py", "trading"),
+)
+
+# 透传给 server.py 的选项
+FAULT_OPTIONS = ("--latency", "--jitter", "--error-rate", "--reset-rate", "--stall-rate", "--stall", "--truncate-rate")
+SERVER_OPTIONS = ("--scale", "--seed") + FAULT_OPTIONS + tuple(
+    "--" + key.replace("_", "-") for key in _fixtures.SIZE_KEYS)
+VALUE_OPTIONS = SERVER_OPTIONS + ("--runs", "--only", "--out", "--compare", "--threshold")
+
+
+# ── 计时 ────────────────────────────────────────────────────
+
+
+def measure(fn, runs, setup=None):
+    """先空跑一次预热，再计时 runs 次。Returns {median_ms, p90_ms, min_ms, runs, errors}。
+
+    fn 抛出 RuntimeError/OSError 或返回 False 计为一次失败，失败的耗时同样计入。
+    """
+    samples, errors = [], 0
+    for i in range(runs + 1):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        try:
+            ok = fn() is not False
+        except (RuntimeError, OSError):
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        if i == 0:
+            continue
+        samples.append(elapsed)
+        errors += not ok
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p90_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))], 3),
+        "min_ms": round(samples[0], 3),
+        "runs": runs,
+        "errors": errors,
+    }
+
+
+# ── 替身服务 ────────────────────────────────────────────────
+
+
+def start_server(options):
+    """以子进程启动 server.py，Returns (Popen, BASE_URL)。"""
+    argv = [sys.executable, os.path.join(BENCH_DIR, "server.py"), "--port=0"]
+    argv += ["%s=%s" % (k, v) for k, v in options.items() if k in SERVER_OPTIONS]
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("READY "):
+        proc.kill()
+        raise SystemExit("替身服务启动失败")
+    return proc, line.split(" ", 1)[1]
+
+
+def raw_body(base_url, path):
+    with urllib.request.urlopen("%s/%s" % (base_url, path), timeout=30) as resp:
+        return resp.read()
+
+
+# ── 各阶段 ──────────────────────────────────────────────────
+
+
+def bench_fetch(common, runs):
+    # 网络失败后用本地缓存兜底（from_cache=True）也算一次失败
+    def fetch(path, cache_name=None, refresh=True):
+        return not common.fetch_json(path, cache_name, refresh=refresh)[1]
+
+    results = {}
+    for name, (path, cache_name) in DATASETS.items():
+        results["fetch/%s" % name] = measure(lambda: fetch(path), runs)
+        common.fetch_json(path, cache_name, refresh=True)
+        results["revalidate/%s" % name] = measure(lambda: fetch(path, cache_name), runs)
+        results["warm/%s" % name] = measure(lambda: fetch(path, cache_name, refresh=False), runs)
+    return results
+
+
+def bench_decode(common, base_url, runs):
+    results = {}
+    snapshot = common.load_script("fetch_snapshot")
+    for name, (path, cache_name) in DATASETS.items():
+        body = raw_body(base_url, path)
+        cache_file = os.path.join(common.CACHE_DIR, cache_name)
+        common.fetch_json(path, cache_name, refresh=True)
+        meta = common._load_meta(cache_file, path)
+        results["decode/json/%s" % name] = measure(lambda: json.loads(body.decode("utf-8")), runs)
+        results["decode/fast/%s" % name] = measure(lambda: common.load_payload(cache_file, meta), runs)
+        if name == "snapshot":
+            keys = snapshot.section_keys(["summary"])
+            results["decode/fast/snapshot:summary"] = measure(
+                lambda: common.load_payload(cache_file, meta, keys), runs)
+    return results
+
+
+def bench_format(common, runs):
+    results = {}
+    snapshot = common.load_script("fetch_snapshot")
+    data, _ = snapshot.fetch()
+    for section in snapshot.SECTIONS:
+        results["format/snapshot/%s" % section] = measure(
+            lambda: snapshot.render_sections(data, [section]), runs)
+
+    # 同一份快照解析成 _models 对象后再格式化（history / 常驻进程保留多日快照时的用法）
+    import _models
+
+    results["format/model/parse"] = measure(lambda: _models.parse_snapshot(data), runs)
+    model = _models.parse_snapshot(data)
+    for section in ("all", "ladder", "hotmoney"):
+        results["format/model/%s" % section] = measure(
+            lambda: snapshot.render_sections(model, [section]), runs)
+
+    margin = common.load_script("margin")
+    data, _ = common.fetch_json(*DATASETS["margin"])
+    for section, fmt in margin.SECTIONS.items():
+        results["format/margin/%s" % section] = measure(lambda: fmt(data), runs)
+
+    news = common.load_script("news")
+    data, _ = common.fetch_json(*DATASETS["news"])
+    items = news._items(data)
+    results["format/news/20"] = measure(lambda: news.fmt_news(items, 20), runs)
+    results["format/news/all"] = measure(lambda: news.fmt_news(items, len(items)), runs)
+
+    cal = common.load_script("calendar")
+    days, week_events, _ = cal._collect(*cal._this_week())
+    results["format/calendar/week"] = measure(lambda: cal.fmt_week(days, week_events), runs)
+    data, _ = cal._fetch_events("unlock", time.strftime("%Y-%m"))
+    events = data.get("events", [])
+    results["format/calendar/unlock"] = measure(lambda: cal.fmt_events(events, "本月解禁"), runs)
+    return results
+
+
+def bench_cli(env, runs):
+    results = {}
+    for case in CLI_CASES:
+        argv = [sys.executable, os.path.join(SCRIPTS_DIR, case[0])] + list(case[1:])
+        label = " ".join((case[0][:-3],) + case[1:])
+
+        def run(cli_env=env):
+            proc = subprocess.run(argv, env=cli_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return proc.returncode == 0
+
+        results["cli/warm/%s" % label] = measure(run, runs)
+
+        cold = {}
+
+        def fresh_cache():
+            if cold.get("dir"):
+                shutil.rmtree(cold["dir"], ignore_errors=True)
+            cold["dir"] = tempfile.mkdtemp(prefix="hhxg-bench-cold-")
+            cold["env"] = dict(env, HHXG_CACHE_DIR=cold["dir"])
+
+        results["cli/cold/%s" % label] = measure(lambda: run(cold["env"]), runs, setup=fresh_cache)
+        shutil.rmtree(cold["dir"], ignore_errors=True)
+    return results
+
+
+# ── 基线 ────────────────────────────────────────────────────
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return out.stdout.strip()
+
+
+def compare(results, baseline, threshold):
+    """逐项对比中位数，打印差异。Returns 回退的用例名列表。"""
+    old = baseline.get("results", {})
+    regressions = []
+    print("\n%-44s %10s %10s %8s" % ("对比基线", "基线 ms", "本次 ms", "变化"))
+    for name, cur in results.items():
+        prev = old.get(name)
+        if not prev:
+            continue
+        a, b = prev["median_ms"], cur["median_ms"]
+        pct = (b - a) / a * 100 if a else 0.0
+        mark = ""
+        if pct > threshold and b - a > NOISE_MS:
+            mark = "  ← 回退"
+            regressions.append(name)
+        print("%-44s %10.3f %10.3f %+7.1f%%%s" % (name, a, b, pct, mark))
+    missing = sorted(set(old) - set(results))
+    if missing:
+        print("\n基线中有、本次未跑: %s" % ", ".join(missing))
+    return regressions
+
+
+def print_results(results):
+    print("%-44s %10s %10s %10s %6s" % ("用例", "中位 ms", "p90 ms", "最小 ms", "失败"))
+    for name, r in results.items():
+        print("%-44s %10.3f %10.3f %10.3f %6d" % (name, r["median_ms"], r["p90_ms"], r["min_ms"], r["errors"]))
+
+
+def main():
+    _, flags, options = _common.parse_argv(value_options=VALUE_OPTIONS)
+    runs = int(options.get("--runs", RUNS))
+    stages = options.get("--only", ",".join(STAGES)).split(",")
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print("未知阶段: %s（可选 %s）" % (", ".join(unknown), ", ".join(STAGES)), file=sys.stderr)
+        sys.exit(2)
+    scale = options.get("--scale", "small")
+    try:
+        sizes = _fixtures.sizes_for(scale, **{
+            key: options.get("--" + key.replace("_", "-")) for key in _fixtures.SIZE_KEYS
+        })
+    except KeyError:
+        print("未知规模: %s（可选 %s）" % (scale, ", ".join(_fixtures.SCALES)), file=sys.stderr)
+        sys.exit(2)
+
+    proc, base_url = start_server(options)
+    cache_dir = tempfile.mkdtemp(prefix="hhxg-bench-")
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.update({
+        "HHXG_BASE_URL": base_url,
+        "HHXG_CACHE_DIR": cache_dir,
+        "HHXG_NO_DAEMON": "1",
+        "HHXG_ARCHIVE": "0",
+        "HHXG_REFRESH": "0",
+    })
+    # 本进程内的用例：_common 已导入，直接改模块级配置
+    _common.BASE_URL, _common.CACHE_DIR, _common.ARCHIVE = base_url, cache_dir, False
+    os.environ["HHXG_NO_DAEMON"] = "1"
+
+    results = {}
+    try:
+        if "fetch" in stages:
+            results.update(bench_fetch(_common, runs))
+        if "decode" in stages:
+            results.update(bench_decode(_common, base_url, runs))
+        if "format" in stages:
+            results.update(bench_format(_common, runs))
+        if "cli" in stages:
+            results.update(bench_cli(env, runs))
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print_results(results)
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "sizes": sizes,
+            "faults": {k[2:]: float(options[k]) for k in FAULT_OPTIONS if k in options},
+            "runs": runs,
+        },
+        "results": results,
+    }
+    baseline = None
+    if options.get("--compare"):
+        with open(options["--compare"], encoding="utf-8") as f:
+            baseline = json.load(f)
+    if "--no-save" not in flags:
+        out = options.get("--out") or os.path.join(BASELINE_DIR, "%s.json" % scale)
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print("\n结果已写入 %s" % out)
+
+    if baseline is not None:
+        if baseline.get("meta", {}).get("sizes") != sizes:
+            print("WARNING: 基线的数据规模与本次不同，对比结果仅供参考", file=sys.stderr)
+        regressions = compare(results, baseline, float(options.get("--threshold", THRESHOLD)))
+        if regressions:
+            print("\n%d 项回退超过 %s%%" % (len(regressions), options.get("--threshold", THRESHOLD)), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
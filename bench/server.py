@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""本地替身数据服务 — 模仿 https://hhxg.top/static/data，供基准测试与离线调试使用。
+
+数据由 _fixtures.py 按规模生成，启动时预先编码（JSON + gzip）并计算 ETag，
+请求阶段只做查表和故障注入，服务端自身开销尽量不计入测量。
+
+Usage:
+    python3 bench/server.py                          # small 规模，随机端口
+    python3 bench/server.py --port=8765 --scale=large
+    python3 bench/server.py --ladder=5000 --news=50000
+    python3 bench/server.py --latency=50 --jitter=20 --error-rate=0.05 --reset-rate=0.02
+
+启动后在 stdout 打印一行 "READY <BASE_URL>"，把它设为 HHXG_BASE_URL 即可让脚本改连替身。
+
+故障注入（按请求独立抽样，--seed 固定随机序列）：
+    --latency=MS      每个请求固定延迟
+    --jitter=MS       额外 0~MS 毫秒的随机延迟
+    --error-rate=P    以概率 P 返回 HTTP 500
+    --reset-rate=P    以概率 P 不回响应直接断开连接
+    --stall-rate=P    以概率 P 挂起 --stall=S 秒（默认 30）后再响应，用于触发客户端超时
+    --truncate-rate=P 以概率 P 只发送一半响应体后断开
+
+辅助端点：GET /_stats 返回请求数与各类故障次数，POST /_reset 清零。
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# http.server 已连带导入标准库 calendar，之后再把 scripts/ 加进 sys.path 不会被同名脚本遮蔽
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import _fixtures
+from _common import parse_argv
+
+PREFIX = "/static/data/"
+FAULTS = ("error", "reset", "stall", "truncate")
+LAST_MODIFIED = "Sat, 17 Oct 2026 12:00:00 GMT"
+
+
+class FaultPlan:
+    """请求级故障注入参数。pick() 按概率抽取一种故障，None 表示正常响应。"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, reset_rate=0.0,
+                 stall_rate=0.0, stall_s=30.0, truncate_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rates = {
+            "error": error_rate,
+            "reset": reset_rate,
+            "stall": stall_rate,
+            "truncate": truncate_rate,
+        }
+        self.stall_s = stall_s
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        return (self.latency_ms + jitter) / 1000
+
+    def pick(self):
+        with self._lock:
+            roll = self._rng.random()
+        for name in FAULTS:
+            rate = self.rates[name]
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+
+    def to_dict(self):
+        return dict(self.rates, latency_ms=self.latency_ms, jitter_ms=self.jitter_ms, stall_s=self.stall_s)
+
+
+class _Body:
+    __slots__ = ("raw", "gz", "etag")
+
+    def __init__(self, obj):
+        self.raw = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.gz = gzip.compress(self.raw, compresslevel=6)
+        self.etag = '"%s"' % hashlib.md5(self.raw).hexdigest()
+
+
+class StandInServer:
+    """预编码好全部数据文件的 HTTP 服务，可在后台线程运行（start/stop）或前台 serve_forever。"""
+
+    def __init__(self, files, faults=None, host="127.0.0.1", port=0):
+        self.bodies = {path: _Body(obj) for path, obj in files.items()}
+        self.faults = faults or FaultPlan()
+        self.stats = {"requests": 0, "not_modified": 0, "not_found": 0}
+        self.stats.update((name, 0) for name in FAULTS)
+        self._stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://%s:%d%s" % (host, port, PREFIX.rstrip("/"))
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，开着 Nagle 会与客户端延迟 ACK 叠加出约 40ms 的假延迟
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _abort(self):
+        """不发响应直接断开（RST），模拟连接被重置。"""
+        self.close_connection = True
+        try:
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        except OSError:
+            pass
+        self.connection.close()
+
+    def do_GET(self):
+        server = self.server.stand_in
+        path = self.path.split("?", 1)[0]
+        if path == "/_stats":
+            with server._stats_lock:
+                stats = dict(server.stats)
+            return self._send(200, json.dumps(stats).encode("utf-8"), [("Content-Type", "application/json")])
+
+        server.count("requests")
+        faults = server.faults
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        fault = faults.pick()
+        if fault:
+            server.count(fault)
+        if fault == "reset":
+            return self._abort()
+        if fault == "stall":
+            time.sleep(faults.stall_s)
+        if fault == "error":
+            return self._send(500, b"stand-in fault")
+
+        body = server.bodies.get(path[len(PREFIX):]) if path.startswith(PREFIX) else None
+        if body is None:
+            server.count("not_found")
+            return self._send(404)
+        if self.headers.get("If-None-Match") == body.etag:
+            server.count("not_modified")
+            return self._send(304, headers=[("ETag", body.etag)])
+
+        headers = [("ETag", body.etag), ("Last-Modified", LAST_MODIFIED), ("Content-Type", "application/json")]
+        payload = body.raw
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            payload = body.gz
+            headers.append(("Content-Encoding", "gzip"))
+        if fault == "truncate":
+            self.send_response(200)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload[:len(payload) // 2])
+            return self._abort()
+        self._send(200, payload, headers)
+
+    def do_POST(self):
+        server = self.server.stand_in
+        if self.path.split("?", 1)[0] != "/_reset":
+            return self._send(404)
+        with server._stats_lock:
+            for key in server.stats:
+                server.stats[key] = 0
+        self._send(204)
+
+
+VALUE_OPTIONS = (
+    "--port", "--host", "--scale", "--seed",
+    "--latency", "--jitter", "--error-rate", "--reset-rate", "--stall-rate", "--stall", "--truncate-rate",
+) + tuple("--" + key.replace("_", "-") for key in _fixtures.SIZE_KEYS)
+
+
+def sizes_from(options):
+    """--scale 预设叠加 --ladder=N 等单项覆盖。"""
+    overrides = {key: options.get("--" + key.replace("_", "-")) for key in _fixtures.SIZE_KEYS}
+    return _fixtures.sizes_for(options.get("--scale", "small"), **overrides)
+
+
+def faults_from(options):
+    return FaultPlan(
+        latency_ms=float(options.get("--latency", 0)),
+        jitter_ms=float(options.get("--jitter", 0)),
+        error_rate=float(options.get("--error-rate", 0)),
+        reset_rate=float(options.get("--reset-rate", 0)),
+        stall_rate=float(options.get("--stall-rate", 0)),
+        stall_s=float(options.get("--stall", 30)),
+        truncate_rate=float(options.get("--truncate-rate", 0)),
+        seed=int(options.get("--seed", 0)),
+    )
+
+
+def main():
+    _, _, options = parse_argv(value_options=VALUE_OPTIONS)
+    try:
+        sizes = sizes_from(options)
+        faults = faults_from(options)
+        port = int(options.get("--port", 0))
+    except KeyError as e:
+        print("未知规模: %s（可选 %s）" % (e.args[0], ", ".join(_fixtures.SCALES)), file=sys.stderr)
+        sys.exit(2)
+    except ValueError as e:
+        print("参数错误: %s" % e, file=sys.stderr)
+        sys.exit(2)
+    files = _fixtures.build(sizes, seed=int(options.get("--seed", 0)))
+    server = StandInServer(files, faults, options.get("--host", "127.0.0.1"), port)
+    print("READY %s" % server.url, flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
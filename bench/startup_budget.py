@@ -0,0 +1,101 @@
+"""启动耗时预算检查：逐个脚本跑 python -X importtime，超预算或导入了网络栈即失败。
+
+每个脚本在独立子进程中 import 多次，取模块累计导入耗时的中位数与 BUDGET_MS 比较；
+同时检查 FORBIDDEN 中的模块没有在 import 阶段被拉进来（它们只应在真正联网时才加载）。
+
+用法：
+    python bench/startup_budget.py              # 检查全部脚本
+    python bench/startup_budget.py news margin  # 只检查指定脚本
+    python bench/startup_budget.py --runs=9     # 每个脚本取 9 次的中位数
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts")
+
+# 脚本 -> import 阶段累计耗时上限（毫秒）。CI 机器抖动大，预算留了数倍余量
+BUDGET_MS = {
+    "fetch_snapshot": 15,
+    "margin": 15,
+    "news": 20,
+    "calendar": 20,
+}
+
+# 命中缓存时用不到的模块；calendar 的日期运算离不开 datetime，单独放行
+FORBIDDEN = ("json", "urllib.request", "http.client", "ssl", "email", "socket", "datetime")
+ALLOWED = {"calendar": ("datetime",)}
+
+RUNS = 5
+
+
+def import_profile(name):
+    """Returns ({模块名: 累计微秒}, 导入的模块名集合)，在干净的子进程里测得。"""
+    code = "import sys; sys.path.insert(0, %r); import %s" % (os.path.abspath(SCRIPTS_DIR), name)
+    env = dict(os.environ)
+    # 预算按命中 pyc 的常态衡量，必须允许写字节码缓存
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError("import %s 失败:\n%s" % (name, proc.stderr))
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        try:
+            us = int(parts[1])
+        except (IndexError, ValueError):
+            continue  # 表头行
+        cumulative[parts[2].strip()] = us
+    return cumulative, set(cumulative)
+
+
+def check(name, runs=RUNS):
+    """Returns 问题描述列表，空列表表示通过。"""
+    import_profile(name)  # 预热：写好 pyc，排除首次编译
+    samples = []
+    problems = []
+    for _ in range(runs):
+        cumulative, modules = import_profile(name)
+        samples.append(cumulative.get(name, 0) / 1000)
+    allowed = ALLOWED.get(name, ())
+    leaked = sorted(m for m in FORBIDDEN if m in modules and m not in allowed)
+    if leaked:
+        problems.append("import 阶段加载了 %s" % ", ".join(leaked))
+    median = statistics.median(samples)
+    budget = BUDGET_MS[name]
+    print("%-16s %6.2f ms  (预算 %d ms)" % (name, median, budget))
+    if median > budget:
+        problems.append("导入耗时 %.2f ms 超出预算 %d ms" % (median, budget))
+    return problems
+
+
+def main():
+    runs = RUNS
+    names = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--runs="):
+            runs = int(arg.split("=", 1)[1])
+        else:
+            names.append(arg)
+    unknown = [n for n in names if n not in BUDGET_MS]
+    if unknown:
+        print("未知脚本: %s（可选 %s）" % (", ".join(unknown), ", ".join(BUDGET_MS)), file=sys.stderr)
+        sys.exit(2)
+    failed = False
+    for name in names or BUDGET_MS:
+        for problem in check(name, runs):
+            print("  FAIL %s: %s" % (name, problem), file=sys.stderr)
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
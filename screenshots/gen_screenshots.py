@@ -159,18 +159,29 @@ def run_script(script: str, *args) -> list[str]:
     return result.stdout.splitlines()
 
 
+def snapshot_sections(*names) -> list[list[str]]:
+    """只拉取一次日报快照，分别渲染多个板块，返回每个板块的输出行。"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(here, "..", "scripts"))
+    import fetch_snapshot
+
+    data, _ = fetch_snapshot.fetch()
+    return [fetch_snapshot.render_sections(data, [n]).splitlines() for n in names]
+
+
 def main():
     out_dir = os.path.dirname(os.path.abspath(__file__))
+    summary, market, themes, ladder = snapshot_sections("summary", "market", "themes", "ladder")
 
     # ── 截图 1：日报快照（summary + market + themes + ladder 节选）──
     print("生成 snapshot.svg ...")
     lines = []
-    lines += run_script("fetch_snapshot.py", "summary")
+    lines += summary
     lines += [""]
-    lines += run_script("fetch_snapshot.py", "market")
+    lines += market
     lines += [""]
     # 只取 themes 前 10 行
-    lines += run_script("fetch_snapshot.py", "themes")[:10]
+    lines += themes[:10]
     lines += ["  ..."]
 
     svg1 = render_svg("恢恢量化 · A股日报快照 — hhxg.top", lines, width=780)
@@ -180,7 +191,6 @@ def main():
     # ── 截图 2：连板天梯 + 融资融券总览 ──
     print("生成 ladder-margin.svg ...")
     lines2 = []
-    ladder = run_script("fetch_snapshot.py", "ladder")
     # 截取连板天梯前 28 行
     lines2 += ladder[:28]
     lines2 += [""]
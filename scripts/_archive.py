@@ -0,0 +1,159 @@
+"""历史归档：按数据日期追加保存日报快照与两融窗口，供 history.py 做区间查询。
+
+目录结构（位于 CACHE_DIR/archive/<dataset>/）：
+    index.json          {key: {"partition": "2026-03", "crc32": [...]}}，key 为数据日期
+    2026-03.jsonl       当月分区，每行 {"key", "crc32", "archived_at", "data"}
+    2026-02.jsonl.gz    往月分区压缩存放
+
+同一 key 内容不变（crc32 相同）时不重复写入；服务端修订过的数据追加为新版本，
+查询时取最后一个版本。
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import time
+import zlib
+
+import _common
+
+# dataset -> 数据日期所在字段
+KEY_FIELDS = {
+    "snapshot": "date",
+    "margin": "window.end",
+}
+
+
+def archive_dir(dataset):
+    return os.path.join(_common.CACHE_DIR, "archive", dataset)
+
+
+def get_field(data, dotted):
+    """按 a.b.c 取嵌套字段，缺失返回 None。"""
+    cur = data
+    for part in dotted.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+
+def _load_index(dataset):
+    return _common._load_cache(os.path.join(archive_dir(dataset), "index.json")) or {}
+
+
+def record(dataset, data):
+    """归档一份数据，已存在相同内容时跳过。Returns 是否写入了新版本。"""
+    key = get_field(data, KEY_FIELDS[dataset])
+    if not isinstance(key, str) or len(key) < 7:
+        return False
+    line = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    crc = zlib.crc32(line.encode("utf-8"))
+    directory = archive_dir(dataset)
+    index_file = os.path.join(directory, "index.json")
+
+    with _common.EntryLock(index_file):
+        index = _load_index(dataset)
+        entry = index.get(key, {"partition": key[:7], "crc32": []})
+        if crc in entry["crc32"]:
+            return False
+        record_line = '{"key": %s, "crc32": %d, "archived_at": %d, "data": %s}\n' % (
+            json.dumps(key), crc, int(time.time()), line,
+        )
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "%s.jsonl" % entry["partition"]), "a", encoding="utf-8") as f:
+            f.write(record_line)
+        entry["crc32"].append(crc)
+        index[key] = entry
+        _common._save_cache(index_file, index)
+    # 日常追加当月数据时顺带压缩往月；补录旧月份不触发，避免反复重写压缩包
+    if key[:7] >= time.strftime("%Y-%m"):
+        compact(dataset)
+    return True
+
+
+def compact(dataset, keep=None):
+    """把 keep 之前月份的未压缩分区合并进 .jsonl.gz。Returns 压缩的分区数。"""
+    directory = archive_dir(dataset)
+    keep = keep or time.strftime("%Y-%m")
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    done = 0
+    # 与 record() 共用 index 锁，压缩期间不会有进程往同一分区追加
+    with _common.EntryLock(os.path.join(directory, "index.json")):
+        for name in sorted(names):
+            if not name.endswith(".jsonl") or name[:7] >= keep:
+                continue
+            plain = os.path.join(directory, name)
+            packed = plain + ".gz"
+            blob = b""
+            if os.path.exists(packed):
+                with gzip.open(packed, "rb") as f:
+                    blob = f.read()
+            with open(plain, "rb") as f:
+                blob += f.read()
+            _common._atomic_write(packed, gzip.compress(blob))
+            os.unlink(plain)
+            done += 1
+    return done
+
+
+def _read_partition(directory, partition):
+    """读出一个分区（压缩 + 未压缩部分）的全部记录，每个 key 只保留最后一个版本。"""
+    latest = {}
+    for name, opener in (
+        ("%s.jsonl.gz" % partition, gzip.open),
+        ("%s.jsonl" % partition, open),
+    ):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 写到一半的尾行
+                latest[rec["key"]] = rec["data"]
+    return latest
+
+
+def keys(dataset):
+    """已归档的全部数据日期（升序）。"""
+    return sorted(_load_index(dataset))
+
+
+def query(dataset, fields=None, since=None, until=None, last=None):
+    """区间查询。
+
+    since / until 为闭区间日期字符串，last 取区间内最近 N 个日期（即最近 N 个交易日）。
+    fields 为 a.b.c 形式的字段列表，为空时返回完整数据。
+    Returns [(date, {field: value} 或 data), ...]，按日期升序。
+    """
+    selected = [
+        k for k in keys(dataset)
+        if (since is None or k >= since) and (until is None or k <= until)
+    ]
+    if last:
+        selected = selected[-last:]
+    if not selected:
+        return []
+    index = _load_index(dataset)
+    directory = archive_dir(dataset)
+    rows = []
+    loaded = {}
+    for k in selected:
+        partition = index[k]["partition"]
+        if partition not in loaded:
+            loaded[partition] = _read_partition(directory, partition)
+        data = loaded[partition].get(k)
+        if data is None:
+            continue
+        if fields:
+            rows.append((k, {f: get_field(data, f) for f in fields}))
+        else:
+            rows.append((k, data))
+    return rows
@@ -0,0 +1,360 @@
+"""列式导出：把归档里的逐股明细摊平成按列存放的定长数组文件，供跨多日的统计分析。
+
+导出的表（行按数据日期升序排列）：
+    ladder    日报 ladder_detail.levels[].stocks   boards, is_success, name, code, industry, area, concept
+    hotmoney  日报 hotmoney.top_net_buy            name, net_yi, ratio_pct
+    seats     日报 hotmoney.seats[].stocks         seat, name, net_yi
+    margin    两融 top.increase_rzye / decrease_rzye  side(1 净买入 / -1 净卖出), name,
+              latest_rzye_yi, delta_rzye_yi, delta_pct
+
+目录结构（位于 CACHE_DIR/columnar/<table>/）：
+    meta.json               行数、日期索引（dates + offsets）、各列类型与文件名、源归档签名
+    <column>-<gen>.bin      数值列：array 原始字节（本机字节序），可 mmap 零拷贝读取
+    <column>-<gen>.bin      字符串列：字典编码后的 uint32 编号
+    <column>-<gen>.dict.json  字符串列的字典（编号 -> 字符串）
+
+日期索引：dates[i] 的行位于 [offsets[i], offsets[i + 1])，按日期区间取数只是切片。
+数值缺失记为 NaN（浮点列）或 0（整数列）。meta 里的 dtype 可直接用于
+numpy.memmap(path, dtype=dtype, mode="r")，本模块自身只依赖标准库。
+
+每次导出整体重建并换一个 gen 写新文件，meta.json 最后原子替换；
+已打开的读者继续读旧文件，不会看到写了一半的列。
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+import _archive
+import _common
+
+STR = "str"  # 字典编码的字符串列，落盘为 uint32 编号
+
+# table -> (归档数据集, ((列名, array typecode 或 STR), ...))
+SCHEMAS = {
+    "ladder": ("snapshot", (
+        ("boards", "h"), ("is_success", "b"),
+        ("name", STR), ("code", STR), ("industry", STR), ("area", STR), ("concept", STR),
+    )),
+    "hotmoney": ("snapshot", (("name", STR), ("net_yi", "d"), ("ratio_pct", "d"))),
+    "seats": ("snapshot", (("seat", STR), ("name", STR), ("net_yi", "d"))),
+    "margin": ("margin", (
+        ("side", "b"), ("name", STR),
+        ("latest_rzye_yi", "d"), ("delta_rzye_yi", "d"), ("delta_pct", "d"),
+    )),
+}
+
+FORMAT_VERSION = 1
+_CODE_TYPE = "I" if array("I").itemsize == 4 else "L"
+_NAN = float("nan")
+
+
+def columnar_dir(table=None):
+    root = os.path.join(_common.CACHE_DIR, "columnar")
+    return os.path.join(root, table) if table else root
+
+
+# ── 行提取 ──────────────────────────────────────────────────
+
+
+def _num(value, default=_NAN):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+
+
+def _text(value):
+    return value if isinstance(value, str) else ""
+
+
+def _dicts(items):
+    return [x for x in items if isinstance(x, dict)] if isinstance(items, list) else []
+
+
+def _ladder_rows(data):
+    for level in _dicts(_archive.get_field(data, "ladder_detail.levels")):
+        boards = int(_num(level.get("boards"), 0))
+        for s in _dicts(level.get("stocks")):
+            yield (
+                boards, 1 if s.get("is_success", True) else 0,
+                _text(s.get("name")), _text(s.get("code")), _text(s.get("industry")),
+                _text(s.get("area")), _text(s.get("concept")),
+            )
+
+
+def _hotmoney_rows(data):
+    for b in _dicts(_archive.get_field(data, "hotmoney.top_net_buy")):
+        yield _text(b.get("name")), _num(b.get("net_yi")), _num(b.get("ratio_pct"))
+
+
+def _seat_rows(data):
+    for seat in _dicts(_archive.get_field(data, "hotmoney.seats")):
+        name = _text(seat.get("name"))
+        for s in _dicts(seat.get("stocks")):
+            yield name, _text(s.get("name")), _num(s.get("net_yi"))
+
+
+def _margin_rows(data):
+    for side, key in ((1, "top.increase_rzye"), (-1, "top.decrease_rzye")):
+        for t in _dicts(_archive.get_field(data, key)):
+            yield (
+                side, _text(t.get("name")),
+                _num(t.get("latest_rzye_yi")), _num(t.get("delta_rzye_yi")), _num(t.get("delta_pct")),
+            )
+
+
+_ROWS = {
+    "ladder": _ladder_rows,
+    "hotmoney": _hotmoney_rows,
+    "seats": _seat_rows,
+    "margin": _margin_rows,
+}
+
+
+# ── 导出 ────────────────────────────────────────────────────
+
+
+def source_signature(dataset):
+    """归档 index 的 crc32：有新归档或修订版本时变化，用来判断列文件是否过期。"""
+    index = _archive._load_index(dataset)
+    return zlib.crc32(json.dumps(index, sort_keys=True).encode("utf-8"))
+
+
+def _dtype(typecode):
+    """array typecode -> numpy dtype 字符串（带字节序）"""
+    kind = "f" if typecode == "d" else ("i" if typecode in "bhilq" else "u")
+    order = "<" if sys.byteorder == "little" else ">"
+    return "%s%s%d" % (order, kind, array(typecode).itemsize)
+
+
+def export(tables=None, force=False):
+    """从归档重建列文件。默认导出全部表，源归档未变化的表跳过（force 强制重建）。
+
+    Returns {table: 行数}，只含本次实际写出的表。
+    """
+    tables = list(tables or SCHEMAS)
+    unknown = [t for t in tables if t not in SCHEMAS]
+    if unknown:
+        raise ValueError("未知列表: %s（可选 %s）" % (", ".join(unknown), ", ".join(SCHEMAS)))
+    written = {}
+    loaded = {}  # 同一数据集只从归档读一次
+    with _common.EntryLock(os.path.join(columnar_dir(), "export")):
+        for table in tables:
+            dataset = SCHEMAS[table][0]
+            signature = source_signature(dataset)
+            meta = _load_meta(table)
+            if not force and meta and meta.get("source") == signature and meta.get("version") == FORMAT_VERSION:
+                continue
+            if dataset not in loaded:
+                loaded[dataset] = _archive.query(dataset)
+            written[table] = _write_table(table, loaded[dataset], signature)
+    return written
+
+
+def _write_table(table, records, signature):
+    dataset, schema = SCHEMAS[table]
+    extract = _ROWS[table]
+    buffers = [array(_CODE_TYPE if kind == STR else kind) for _, kind in schema]
+    lookups = [{} if kind == STR else None for _, kind in schema]
+    appenders = [buf.append for buf in buffers]
+    dates, offsets = [], [0]
+    for date, data in records:
+        for row in extract(data):
+            for i, value in enumerate(row):
+                lookup = lookups[i]
+                if lookup is not None:
+                    value = lookup.setdefault(value, len(lookup))
+                appenders[i](value)
+        dates.append(date)
+        offsets.append(len(buffers[0]))
+
+    directory = columnar_dir(table)
+    gen = "%x" % time.time_ns()
+    columns = {}
+    for (name, kind), buf, lookup in zip(schema, buffers, lookups):
+        entry = {"file": "%s-%s.bin" % (name, gen), "typecode": buf.typecode, "dtype": _dtype(buf.typecode)}
+        _common._atomic_write(os.path.join(directory, entry["file"]), buf.tobytes())
+        if lookup is not None:
+            entry["dict"] = "%s-%s.dict.json" % (name, gen)
+            _common._atomic_write(
+                os.path.join(directory, entry["dict"]),
+                json.dumps(list(lookup), ensure_ascii=False).encode("utf-8"),
+            )
+        columns[name] = entry
+    meta = {
+        "version": FORMAT_VERSION,
+        "table": table,
+        "dataset": dataset,
+        "source": signature,
+        "exported_at": int(time.time()),
+        "byteorder": sys.byteorder,
+        "rows": offsets[-1],
+        "dates": dates,
+        "offsets": offsets,
+        "columns": columns,
+    }
+    _common._atomic_write(
+        os.path.join(directory, "meta.json"),
+        json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+    )
+    _remove_stale(directory, meta)
+    return meta["rows"]
+
+
+def _remove_stale(directory, meta):
+    """删掉不再被 meta 引用的旧 gen 文件。已 mmap 旧文件的读者不受影响（Windows 上删不掉就留到下次）。"""
+    keep = {"meta.json"}
+    for entry in meta["columns"].values():
+        keep.add(entry["file"])
+        if "dict" in entry:
+            keep.add(entry["dict"])
+    for name in os.listdir(directory):
+        if name not in keep and (name.endswith(".bin") or name.endswith(".dict.json")):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def _load_meta(table):
+    return _common._load_cache(os.path.join(columnar_dir(table), "meta.json"))
+
+
+# ── 读取 ────────────────────────────────────────────────────
+
+
+class Table:
+    """一张列表的只读视图。column() 返回 mmap 上的 memoryview（零拷贝），按需打开、按列缓存。"""
+
+    def __init__(self, table, meta):
+        self.name = table
+        self.meta = meta
+        self.dates = meta["dates"]
+        self.offsets = meta["offsets"]
+        self.rows = meta["rows"]
+        self.directory = columnar_dir(table)
+        self._columns = {}
+        self._strings = {}
+        self._maps = []
+
+    @property
+    def column_names(self):
+        return list(self.meta["columns"])
+
+    def _entry(self, name):
+        try:
+            return self.meta["columns"][name]
+        except KeyError:
+            raise KeyError("%s 表没有列 %s（可选 %s）" % (self.name, name, ", ".join(self.column_names))) from None
+
+    def column(self, name):
+        """整列的 memoryview（format 为 array typecode），字符串列为字典编号。"""
+        view = self._columns.get(name)
+        if view is not None:
+            return view
+        entry = self._entry(name)
+        path = os.path.join(self.directory, entry["file"])
+        if self.rows == 0:
+            view = memoryview(array(entry["typecode"]))
+        elif self.meta.get("byteorder") != sys.byteorder:
+            # 跨平台拷贝过来的文件：只能读出后翻转字节序，不再零拷贝
+            buf = array(entry["typecode"])
+            with open(path, "rb") as f:
+                buf.frombytes(f.read())
+            buf.byteswap()
+            view = memoryview(buf)
+        else:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            view = memoryview(mapped).cast(entry["typecode"])
+        self._columns[name] = view
+        return view
+
+    def strings(self, name):
+        """字符串列的字典：编号 -> 字符串。"""
+        values = self._strings.get(name)
+        if values is None:
+            entry = self._entry(name)
+            if "dict" not in entry:
+                raise ValueError("%s 不是字符串列" % name)
+            values = _common._load_cache(os.path.join(self.directory, entry["dict"])) or []
+            self._strings[name] = values
+        return values
+
+    def path(self, name):
+        """列文件路径与 dtype，供 numpy.memmap(path, dtype=dtype, mode="r") 使用。"""
+        entry = self._entry(name)
+        return os.path.join(self.directory, entry["file"]), entry["dtype"]
+
+    def date_slice(self, since=None, until=None, last=None):
+        """日期区间（闭区间，last 取区间内最近 N 个日期）在 dates 里的下标范围 (lo, hi)。"""
+        lo = bisect_left(self.dates, since) if since else 0
+        hi = bisect_right(self.dates, until) if until else len(self.dates)
+        if last:
+            lo = max(lo, hi - last)
+        return (lo, hi) if lo < hi else (0, 0)
+
+    def span(self, since=None, until=None, last=None):
+        """日期区间对应的行范围 (start, stop)。"""
+        lo, hi = self.date_slice(since, until, last)
+        return self.offsets[lo], self.offsets[hi]
+
+    def close(self):
+        for view in self._columns.values():
+            view.release()
+        self._columns.clear()
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # 调用方还持有列切片，交给垃圾回收
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_table(table, refresh=True):
+    """打开一张列表；refresh 时先检查归档是否有更新，过期则重新导出。没有可用列文件时抛 RuntimeError。"""
+    if table not in SCHEMAS:
+        raise ValueError("未知列表: %s（可选 %s）" % (table, ", ".join(SCHEMAS)))
+    if refresh:
+        export([table])
+    meta = _load_meta(table)
+    if not meta or meta.get("version") != FORMAT_VERSION:
+        raise RuntimeError("没有 %s 的列式数据，请先运行 history.py export" % table)
+    return Table(table, meta)
+
+
+def group_by(table, by, value=None, since=None, until=None, last=None):
+    """按字符串列 by 分组，统计行数与 value 列之和（NaN 不计入）。
+
+    只扫描日期区间对应的两段连续列切片，不解析任何 JSON。
+    Returns [(key, count, total), ...]，按 total 降序（无 value 时按 count）。
+    """
+    if value is not None and "dict" in table._entry(value):
+        raise ValueError("%s 是字符串列，不能求和" % value)
+    start, stop = table.span(since, until, last)
+    keys = table.strings(by)
+    codes = table.column(by)[start:stop]
+    counts = [0] * len(keys)
+    totals = [0.0] * len(keys)
+    if value is None:
+        for code in codes:
+            counts[code] += 1
+    else:
+        for code, v in zip(codes, table.column(value)[start:stop]):
+            counts[code] += 1
+            if v == v:  # 跳过 NaN
+                totals[code] += v
+    groups = [(keys[i], counts[i], totals[i]) for i in range(len(keys)) if counts[i]]
+    groups.sort(key=lambda g: (g[2] if value is not None else g[1]), reverse=True)
+    return groups
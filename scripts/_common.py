@@ -1,63 +1,407 @@
 """共用工具：HTTP 请求 + 本地缓存 + schema 检查。"""
 from __future__ import annotations
 
-import json
+# 冷启动：缓存命中时不需要 json（连带 re/enum 等，约占解释器启动的一半）和网络栈，
+# 都放到用到它们的函数里再导入
 import os
 import sys
 import time
-import urllib.error
-import urllib.request
 
-BASE_URL = "https://hhxg.top/static/data"
-CACHE_DIR = os.path.expanduser("~/.cache/hhxg-market")
+# HHXG_BASE_URL / HHXG_CACHE_DIR 可改指向本地替身服务与独立缓存目录（bench/ 基准测试使用）
+BASE_URL = (os.environ.get("HHXG_BASE_URL") or "https://hhxg.top/static/data").rstrip("/")
+CACHE_DIR = os.environ.get("HHXG_CACHE_DIR") or os.path.expanduser("~/.cache/hhxg-market")
 SUPPORTED_SCHEMA = 3
 HEADERS = {
     "User-Agent": "hhxg-skill/1.0",
     "X-Skill-Client": "clawhub",
 }
 
+# 缓存有效期：盘后数据在下一次发布前一直有效，快讯走短 TTL
+PUBLISH_HOUR = 20           # 交易日盘后约 20:00（北京时间）发布
+PUBLISH_GRACE = 3600        # 发布后 1 小时内可能延迟上线，只按 SHORT_TTL 缓存
+SHORT_TTL = 600
+TZ_OFFSET = 8 * 3600        # 北京时间 UTC+8
+TTL_RULES = (
+    ("news/", 60),          # 快讯滚动更新，缓存 60 秒
+)
 
-def fetch_json(path, cache_name=None):
-    """获取 JSON 数据，网络抖动自动重试一次，失败时用本地缓存兜底。
+# 传输层：分块读取并边下边解压
+CHUNK_SIZE = 64 * 1024
+DEBUG = os.environ.get("HHXG_DEBUG") == "1"
+TRANSFER_STATS = []         # 本进程每次下载的 {path, encoding, wire_bytes, decoded_bytes}
 
-    Returns (data, from_cache) 元组。
+# --refresh 或 HHXG_REFRESH=1 时跳过新鲜缓存，强制走网络
+REFRESH = os.environ.get("HHXG_REFRESH") == "1"
+
+# stale-while-revalidate：过期不超过 MAX_STALE 秒的缓存先直接返回，同时起一个脱离的后台进程刷新，
+# 下一次调用拿到新数据。按 path 前缀匹配 STALE_RULES，HHXG_MAX_STALE 统一覆盖（0 关闭）
+MAX_STALE = 3600
+STALE_RULES = (
+    ("news/", 600),
+)
+REFRESH_GUARD = 30          # 同一条目的后台刷新在此秒数内只起一个
+
+# 下载到新的日报 / 两融数据时按数据日期归档（history.py 查询），快讯并入本地检索库
+# （news.py search），HHXG_ARCHIVE=0 关闭
+ARCHIVE = os.environ.get("HHXG_ARCHIVE") != "0"
+ARCHIVE_DATASETS = {
+    "assistant/skill_snapshot.json": "snapshot",
+    "assistant/recent_margin_7d.json": "margin",
+    "news/n0.json": "news",
+}
+
+# 跨进程单飞：刷新同一缓存条目时其他进程最多等待 LOCK_WAIT 秒
+LOCK_WAIT = 20
+LOCK_POLL = 0.05
+
+# 常驻进程（daemon.py）开启内存缓存：解析后的数据留在内存，按同样的 TTL 失效
+MEMORY_CACHE = False
+_MEMORY = {}                # path -> {"cache_name", "data", "expires_at"}
+_FLIGHTS = {}               # path -> Lock，同一数据集的并发请求只发一次上游
+
+# 守护进程：脚本先尝试把调用转交给 daemon.py，未运行时走原有路径。
+# 守护进程按自己启动时的环境取数，调用方设置了下列变量时在本进程执行，保证设置生效
+DAEMON_TIMEOUT = 30
+IN_DAEMON = False
+LOCAL_ENV = ("HHXG_REFRESH", "HHXG_MAX_STALE", "HHXG_DEADLINE", "HHXG_HEDGE", "HHXG_ARCHIVE")
+
+
+class NotFoundError(RuntimeError):
+    """数据文件不存在 (HTTP 404)，如该月份日历尚未生成。"""
+
+
+def fetch_json(path, cache_name=None, refresh=None, keys=None):
+    """获取 JSON 数据：缓存未过期直接读本地，否则请求网络。
+
+    网络失败在 FETCH_DEADLINE 秒内退避重试，仍失败或上游熔断中时用本地缓存兜底（不论是否过期）。
+    refresh=True 时跳过新鲜缓存，默认跟随 --refresh 参数。
+    keys 为顶层字段列表时，命中本地缓存只解码这些字段（见 load_payload），网络拉取仍返回完整数据。
+
+    Returns (data, from_cache) 元组：from_cache 为 True 表示网络失败后的兜底，
+    为 "stale" 表示过期缓存先行返回、后台正在刷新（见 max_stale），否则为 False。
     """
-    url = "%s/%s" % (BASE_URL, path)
+    if refresh is None:
+        refresh = REFRESH or "--refresh" in sys.argv[1:]
+    if not MEMORY_CACHE:
+        return _fetch_json(path, cache_name, refresh, keys)
+
+    entry = _MEMORY.get(path)
+    if entry and not refresh and entry["expires_at"] > time.time():
+        return entry["data"], False
+    # 同一 path 的并发请求排队：第一个去拉取，其余等它写入内存后直接复用
+    with _flight_lock(path):
+        entry = _MEMORY.get(path)
+        if entry and not refresh and entry["expires_at"] > time.time():
+            return entry["data"], False
+        data, from_cache = _fetch_json(path, cache_name, refresh)
+        if not from_cache:
+            meta = _load_meta(os.path.join(CACHE_DIR, cache_name), path) if cache_name else None
+            expires_at = meta["expires_at"] if meta else cache_ttl(path, data=data)
+            _MEMORY[path] = {"cache_name": cache_name, "data": data, "expires_at": expires_at}
+    return data, from_cache
+
+
+def _flight_lock(path):
+    import threading
+
+    # dict.setdefault 是原子操作，多线程下每个 path 只会得到同一把锁
+    return _FLIGHTS.setdefault(path, threading.Lock())
+
+
+def _fetch_json(path, cache_name, refresh, keys=None):
     cache_file = os.path.join(CACHE_DIR, cache_name) if cache_name else None
 
+    meta = _load_meta(cache_file, path) if cache_file else None
+    if meta and not refresh:
+        overdue = time.time() - meta.get("expires_at", 0)
+        if overdue < 0:
+            cached = load_payload(cache_file, meta, keys)
+            if cached is not None:
+                return cached, False
+        elif overdue <= max_stale(path):
+            cached = load_payload(cache_file, meta, keys)
+            if cached is not None:
+                spawn_refresh(path, cache_name)
+                return cached, "stale"
+    if not cache_file:
+        return _fetch_remote(path, None, None)
+
+    # 多个进程同时要刷新同一缓存条目时只由拿到锁的进程拉取，其余等它写完直接读结果
+    with EntryLock(cache_file) as lock:
+        if lock.waited:
+            meta = _load_meta(cache_file, path)
+            if meta and meta.get("fetched_at", 0) >= lock.since:
+                cached = load_payload(cache_file, meta, keys)
+                if cached is not None:
+                    return cached, False
+        return _fetch_remote(path, cache_file, meta)
+
+
+def _env_seconds(name):
+    """读取秒数型环境变量，负数按 0 处理；未设置或写错（如 "10s"）时返回 None，由调用方用默认值。"""
+    value = os.environ.get(name)
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def max_stale(path):
+    """过期多少秒以内的缓存可以先返回再后台刷新。"""
+    override = _env_seconds("HHXG_MAX_STALE")
+    if override is not None:
+        return override
+    for prefix, limit in STALE_RULES:
+        if path.startswith(prefix):
+            return limit
+    return MAX_STALE
+
+
+def spawn_refresh(path, cache_name):
+    """起一个脱离当前会话的子进程强制刷新该缓存条目，不等待它结束。
+
+    常驻进程（MEMORY_CACHE 开启：守护进程、网关、async_client）里改用后台线程，不另起进程。
+    <cache>.refreshing 标记 REFRESH_GUARD 秒内已有刷新在跑，重复调用直接跳过。
+    """
+    marker = os.path.join(CACHE_DIR, cache_name) + ".refreshing"
+    spawn_task(marker, "_common", "_refresh_entry", path, cache_name)
+
+
+def spawn_task(marker, module, func, *args):
+    """在后台执行 module.func(*args)：脱离当前会话的子进程，MEMORY_CACHE 开启时为后台线程。
+
+    marker 文件标记 REFRESH_GUARD 秒内已有同一任务在跑，重复调用直接跳过；func 结束时应删掉它。
+    参数须可 repr 还原（字符串、数字）。
+    """
+    try:
+        if time.time() - os.stat(marker).st_mtime < REFRESH_GUARD:
+            return
+    except OSError:
+        pass
+    try:
+        with open(marker, "w"):
+            pass
+    except OSError:
+        return
+    if MEMORY_CACHE:
+        import importlib
+        import threading
+
+        target = getattr(importlib.import_module(module), func)
+        threading.Thread(target=target, args=args, daemon=True).start()
+        return
+
+    import subprocess
+
+    # 追加到 sys.path 末尾，避免 scripts/calendar.py 遮蔽标准库 calendar
+    code = "import sys; sys.path.append(%r); import %s; %s.%s(*%r)" % (
+        os.path.dirname(os.path.abspath(__file__)), module, module, func, args,
+    )
+    env = dict(os.environ, HHXG_BASE_URL=BASE_URL, HHXG_CACHE_DIR=CACHE_DIR, HHXG_NO_DAEMON="1")
+    kwargs = {"creationflags": 0x00000008} if os.name == "nt" else {"start_new_session": True}
+    try:
+        subprocess.Popen(
+            [sys.executable, "-c", code], env=env, close_fds=True,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs
+        )
+    except OSError:
+        _remove_quietly(marker)
+
+
+def _refresh_entry(path, cache_name):
+    """spawn_refresh 子进程入口：强制拉取一次写入缓存，结束后清掉标记。"""
+    try:
+        _fetch_json(path, cache_name, True)
+    except RuntimeError:
+        pass
+    finally:
+        _remove_quietly(os.path.join(CACHE_DIR, cache_name) + ".refreshing")
+
+
+def _remove_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _fetch_remote(path, cache_file, meta):
+    import json
+
+    url = "%s/%s" % (BASE_URL, path)
+
+    # 有本地副本时带上 ETag / Last-Modified 做条件请求，304 直接复用缓存
+    headers = dict(HEADERS)
+    headers["Accept-Encoding"] = _accept_encoding()
+    if meta and os.path.exists(cache_file):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    # 在总时限内按指数退避 + 抖动重试；上游处于熔断期时不发请求，直接走缓存兜底
+    host = _host_of(url)
+    upstream = _get_upstream()
+    deadline = time.monotonic() + FETCH_DEADLINE
     last_err = None
-    for attempt in range(2):
+    attempt = 0
+    while True:
+        if not upstream.allow(host):
+            last_err = None
+            break
+        start = time.monotonic()
         try:
-            req = urllib.request.Request(url, headers=HEADERS)
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                data = json.loads(resp.read().decode("utf-8"))
-            if cache_file:
-                _save_cache(cache_file, data)
-            return data, False
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                raise RuntimeError(
-                    "数据接口不存在 (404)，请升级技能：\n"
-                    "  cd ~/.claude/skills/hhxg-market && git pull"
-                )
-            raise RuntimeError("服务端错误 HTTP %s，请稍后重试" % e.code)
-        except json.JSONDecodeError:
-            raise RuntimeError("数据格式异常，服务端可能在维护，请稍后重试")
-        except urllib.error.URLError as e:
+            status, resp_headers, body = _request(url, headers, path, deadline)
+        except (OSError, _http_errors()) as e:
             last_err = e
-            if attempt == 0:
-                time.sleep(1)
+            upstream.record(host, path, False)
+        else:
+            if status in RETRY_STATUS:
+                last_err = RuntimeError("服务端错误 HTTP %s，请稍后重试" % status)
+                upstream.record(host, path, False)
+            else:
+                upstream.record(host, path, True, time.monotonic() - start)
+                if status == 200:
+                    try:
+                        data = json.loads(body.decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        raise RuntimeError("数据格式异常，服务端可能在维护，请稍后重试")
+                    if cache_file:
+                        crc = _save_payload(cache_file, data, body)
+                        _save_meta(cache_file, path, dict(_validators(resp_headers), crc32=crc), data)
+                    _archive_payload(path, data)
+                    return data, False
+                if status == 304 and cache_file:
+                    cached = load_payload(cache_file, meta)
+                    if cached is not None:
+                        # 内容未变：只续期元数据，不重写数据文件
+                        _save_meta(cache_file, path, dict(meta or {}, **_validators(resp_headers)), cached)
+                        return cached, False
+                    # 本地副本损坏，去掉条件头立即重新下载（不算重试）
+                    headers.pop("If-None-Match", None)
+                    headers.pop("If-Modified-Since", None)
+                    continue
+                if status == 404:
+                    raise NotFoundError(
+                        "数据接口不存在 (404)，请升级技能：\n"
+                        "  cd ~/.claude/skills/hhxg-market && git pull"
+                    )
+                raise RuntimeError("服务端错误 HTTP %s，请稍后重试" % status)
+        attempt += 1
+        delay = _backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            break
+        time.sleep(delay)
 
-    # 两次都失败，尝试缓存兜底
+    # 时限用尽或熔断中，尝试缓存兜底
     if cache_file:
-        cached = _load_cache(cache_file)
+        cached = load_payload(cache_file, meta)
         if cached:
             return cached, True
+    if last_err is None:
+        raise RuntimeError(
+            "上游连续请求失败，已暂停访问（约 %d 秒后恢复），且无本地缓存。"
+            "请稍后重试或直接访问 https://hhxg.top" % upstream.remaining(host)
+        )
+    if isinstance(last_err, RuntimeError):
+        raise last_err
     raise RuntimeError(
         "网络不可用，且无本地缓存。请稍后重试或直接访问 https://hhxg.top"
     )
 
 
+def _archive_payload(path, data):
+    dataset = ARCHIVE_DATASETS.get(path)
+    if not ARCHIVE or dataset is None:
+        return
+    try:
+        if dataset == "news":
+            import _news_store
+
+            _news_store.add(data if isinstance(data, list) else data.get("items", []))
+        else:
+            import _archive
+
+            _archive.record(dataset, data)
+    except (OSError, ValueError):
+        pass  # 归档失败不影响本次查询
+
+
+class EntryLock:
+    """缓存条目的跨进程排他锁（fcntl.flock，锁文件为 <cache>.lock）。
+
+    拿不到锁时每 LOCK_POLL 秒重试，最多等 LOCK_WAIT 秒，超时后不加锁继续；
+    waited 表示是否等过别的进程，since 为开始等待的时间戳。
+    不支持 fcntl 的平台（Windows）上为空操作。
+    """
+
+    def __init__(self, cache_file, timeout=None):
+        self.path = cache_file + ".lock"
+        self.timeout = LOCK_WAIT if timeout is None else timeout
+        self.waited = False
+        self.since = time.time()
+        self._fd = None
+
+    def __enter__(self):
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            return self
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except BlockingIOError:
+                self.waited = True
+                if time.monotonic() >= deadline:
+                    os.close(self._fd)
+                    self._fd = None
+                    return self
+                time.sleep(LOCK_POLL)
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            import fcntl
+
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        return False
+
+
+def fetch_many(requests, refresh=None, max_workers=8):
+    """并发获取多个 JSON 文件，每个文件沿用 fetch_json 的缓存与兜底逻辑。
+
+    requests 为 [(path, cache_name), ...]。
+    Returns {path: (data, from_cache) 或 RuntimeError}，单个文件失败不影响其他文件。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = {}
+    if not requests:
+        return results
+    workers = max(1, min(max_workers, len(requests)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            (path, pool.submit(fetch_json, path, cache_name, refresh))
+            for path, cache_name in requests
+        ]
+        for path, future in futures:
+            try:
+                results[path] = future.result()
+            except RuntimeError as e:
+                results[path] = e
+    return results
+
+
 def check_schema(data):
     """schema 版本检查。"""
     meta = data.get("meta", {})
@@ -71,19 +415,117 @@ def check_schema(data):
 
 
 def print_cache_hint(from_cache, date_str):
-    """缓存兜底时输出提示。"""
-    if from_cache:
-        print(
-            "NOTE: 网络不可用，以下为本地缓存数据（%s）\n" % date_str,
-            file=sys.stderr,
-        )
+    """缓存兜底或先行返回过期缓存时输出提示。"""
+    if not from_cache:
+        return
+    when = "（%s）" % date_str if date_str else ""
+    if from_cache == "stale":
+        msg = "NOTE: 以下为本地缓存数据%s，已在后台更新，再次查询即为最新\n" % when
+    else:
+        msg = "NOTE: 网络不可用，以下为本地缓存数据%s\n" % when
+    print(msg, file=sys.stderr)
+
+
+def load_script(name):
+    """按文件路径导入 scripts/ 下的脚本模块（如 calendar 会与标准库同名，不能直接 import）。"""
+    import importlib.util
+
+    mod_name = "hhxg_%s" % name
+    if mod_name in sys.modules:
+        return sys.modules[mod_name]
+    # 网关等多线程场景下避免拿到执行到一半的模块
+    with _flight_lock("module:" + mod_name):
+        if mod_name in sys.modules:
+            return sys.modules[mod_name]
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "%s.py" % name)
+        spec = importlib.util.spec_from_file_location(mod_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[mod_name] = module
+    return module
+
+
+def daemon_socket():
+    """daemon.py 监听的 Unix socket 路径。"""
+    return os.path.join(CACHE_DIR, "daemon.sock")
+
+
+def delegate_to_daemon(script):
+    """daemon.py 在运行时把本次调用转交给它，输出结果后直接退出进程。
+
+    守护进程未运行、连接失败、HHXG_NO_DAEMON=1 或设置了 LOCAL_ENV 中的变量时返回，调用方继续本地执行。
+    """
+    if IN_DAEMON or os.environ.get("HHXG_NO_DAEMON") == "1":
+        return
+    if any(os.environ.get(name) for name in LOCAL_ENV):
+        return
+    sock_path = daemon_socket()
+    if not os.path.exists(sock_path):
+        return
+    import json
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    request = {"script": script, "argv": sys.argv[1:]}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_TIMEOUT)
+            sock.connect(sock_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        reply = json.loads(b"".join(chunks).decode("utf-8"))
+    except (OSError, ValueError):
+        return
+    if not isinstance(reply, dict) or "code" not in reply:
+        return
+    sys.stderr.write(reply.get("stderr", ""))
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stdout.flush()
+    sys.exit(reply["code"])
+
+
+def _is_flag(arg):
+    """以 - 开头的参数视为选项，负数（如 calendar.py offset 的 -3）除外。"""
+    return arg.startswith("-") and not arg[1:].isdigit()
+
+
+# 带取值的选项，支持 --fields a,b 与 --fields=a,b 两种写法
+VALUE_OPTIONS = ("--fields",)
+
+
+def parse_argv(argv=None, value_options=VALUE_OPTIONS):
+    """拆分命令行。Returns (位置参数列表, 开关集合, {选项: 取值})。"""
+    argv = sys.argv[1:] if argv is None else argv
+    args, flags, options = [], set(), {}
+    i = 0
+    while i < len(argv):
+        a = argv[i]
+        name = a.split("=", 1)[0]
+        if name in value_options:
+            if "=" in a:
+                options[name] = a.split("=", 1)[1]
+            elif i + 1 < len(argv):
+                options[name] = argv[i + 1]
+                i += 1
+        elif _is_flag(a):
+            flags.add(a)
+        else:
+            args.append(a)
+        i += 1
+    return args, flags, options
 
 
 def run_main(sections, default="all"):
     """通用 main 入口：解析 args、fetch、输出。"""
-    args = [a for a in sys.argv[1:] if not a.startswith("-")]
-    flags = {a for a in sys.argv[1:] if a.startswith("-")}
-    use_json = "--json" in flags
+    args, flags, _ = parse_argv()
+    use_json = "--json" in flags or "--jsonl" in flags
 
     section = args[0] if args else default
     if section not in sections:
@@ -94,18 +536,830 @@ def run_main(sections, default="all"):
     return section, args[1:], use_json
 
 
+# ── JSON 输出：--jsonl 逐条流式输出，--fields 字段投影 ─────────────
+
+
+def output_options():
+    """Returns (fields, jsonl)：fields 为 parse_fields 结果或 None。"""
+    _, flags, options = parse_argv()
+    fields = parse_fields(options["--fields"]) if options.get("--fields") else None
+    jsonl = "--jsonl" in flags
+    if jsonl and fields and "[]" in fields[0]:
+        head = fields[0][:fields[0].index("[]") + 1]
+        if any(parts[:len(head)] != head for parts in fields):
+            print("--jsonl 模式下 --fields 须指向同一个数组: %s" % ".".join(head).replace(".[]", "[]"))
+            sys.exit(1)
+    return fields, jsonl
+
+
+def parse_fields(spec):
+    """"hotmoney.seats[].name,date" -> [["hotmoney", "seats", "[]", "name"], ["date"]]。"""
+    fields = []
+    for item in spec.split(","):
+        parts = []
+        for part in item.strip().split("."):
+            while part.endswith("[]"):
+                part = part[:-2]
+                if part:
+                    parts.append(part)
+                parts.append("[]")
+                part = ""
+            if part:
+                parts.append(part)
+        if parts:
+            fields.append(parts)
+    return fields
+
+
+_MISSING = object()
+
+
+def _pick(value, parts):
+    """按路径裁剪 value，保留原有嵌套结构；遇到列表自动逐项投影（[] 可省略）。"""
+    if not parts:
+        return value
+    if isinstance(value, list):
+        rest = parts[1:] if parts[0] == "[]" else parts
+        picked = (_pick(v, rest) for v in value)
+        return [{} if v is _MISSING else v for v in picked]
+    if parts[0] == "[]" or not isinstance(value, dict) or parts[0] not in value:
+        return _MISSING
+    inner = _pick(value[parts[0]], parts[1:])
+    return _MISSING if inner is _MISSING else {parts[0]: inner}
+
+
+def _merge(a, b):
+    if isinstance(a, dict) and isinstance(b, dict):
+        out = dict(a)
+        for k, v in b.items():
+            out[k] = _merge(out[k], v) if k in out else v
+        return out
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        return [_merge(x, y) for x, y in zip(a, b)]
+    return b
+
+
+def project(data, fields):
+    """只保留 fields 指定的字段，多个字段的结果合并回同一结构。"""
+    out = _MISSING
+    for parts in fields:
+        picked = _pick(data, parts)
+        if picked is not _MISSING:
+            out = picked if out is _MISSING else _merge(out, picked)
+    if out is _MISSING:
+        return [] if isinstance(data, list) else {}
+    return out
+
+
+def _explode(data, fields):
+    """--jsonl 配合带 [] 的字段：以第一个 [] 之前的数组为记录流，其余路径投影每条记录。
+
+    各字段须共用同一数组前缀，由 output_options 预先校验。
+    """
+    head = fields[0][:fields[0].index("[]")]
+    rest = [parts[len(head) + 1:] for parts in fields if parts[len(head) + 1:]]
+    records = data
+    for part in head:
+        records = records.get(part) if isinstance(records, dict) else None
+    return records if isinstance(records, list) else [], rest or None
+
+
+def write_json(payload, records=None, fields=None, jsonl=False, out=None):
+    """输出 --json / --jsonl 结果，边投影边写出，不先拼出完整字符串。
+
+    jsonl=True 时逐条写 records（可为生成器，缺省为 payload 本身或其列表元素），
+    fields 相对每条记录；若 fields 含 []，则改以该数组元素为记录（见 _explode）。
+    jsonl=False 时 fields 相对 payload，输出与原 --json 一致的缩进 JSON。
+    """
+    import json
+
+    out = out or sys.stdout
+    if not jsonl:
+        json.dump(project(payload, fields) if fields else payload, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+        return
+    if fields and "[]" in fields[0]:
+        records, fields = _explode(payload, fields)
+    elif records is None:
+        records = payload if isinstance(payload, list) else [payload]
+    for rec in records:
+        out.write(json.dumps(project(rec, fields) if fields else rec, ensure_ascii=False))
+        out.write("\n")
+
+
+def cache_ttl(path, now=None, data=None):
+    """按数据集返回缓存过期时间戳（epoch 秒）。
+
+    data 带数据日期（日报快照的 date / meta.generated_at）时，只有属于最近一轮发布的数据
+    才缓存到下一次发布；发布延迟、拿到的仍是上一轮数据时只按 SHORT_TTL 缓存，
+    之后的查询继续访问网络，新数据上线后即可拿到。
+    """
+    now = time.time() if now is None else now
+    for prefix, ttl in TTL_RULES:
+        if path.startswith(prefix):
+            return now + ttl
+    # 盘后数据：下一次 PUBLISH_HOUR 之前一直有效
+    local = now + TZ_OFFSET
+    publish = local - local % 86400 + PUBLISH_HOUR * 3600
+    if publish <= local < publish + PUBLISH_GRACE:
+        return now + SHORT_TTL
+    if _data_date(data) and not is_published(data, publish_window_date(now)):
+        return now + SHORT_TTL
+    if local < publish:
+        return publish - TZ_OFFSET
+    return publish + 86400 - TZ_OFFSET
+
+
+def _data_date(data):
+    """数据所属日期（YYYY-MM-DD）：date 与 meta.generated_at 中较晚者，都没有时为空串。"""
+    if not isinstance(data, dict):
+        return ""
+    meta = data.get("meta")
+    generated = meta.get("generated_at") if isinstance(meta, dict) else None
+    return max(str(data.get("date") or ""), str(generated or "")[:10])
+
+
+def is_published(data, window_date):
+    """快照是否属于 window_date（YYYY-MM-DD）这一轮发布：数据日期或生成时间不早于窗口当天。
+
+    不与本地旧缓存比较：没有缓存或缓存早于上一轮发布时，昨天的数据也会"比缓存新"。
+    """
+    return _data_date(data) >= window_date
+
+
+def publish_window_date(now=None):
+    """最近一轮已过发布宽限期的发布窗口日期（YYYY-MM-DD，北京时间）。
+
+    从今天（未过 PUBLISH_HOUR + PUBLISH_GRACE 时从昨天）往前找最近的交易日。
+    只读本地已缓存的交易日历，不访问网络；该年日历不在缓存里时按周一至周五判断。
+    """
+    local = (time.time() if now is None else now) + TZ_OFFSET
+    if local % 86400 < PUBLISH_HOUR * 3600 + PUBLISH_GRACE:
+        local -= 86400
+    calendars = {}
+    for _ in range(30):
+        day = time.gmtime(local)
+        date = time.strftime("%Y-%m-%d", day)
+        if day.tm_year not in calendars:
+            calendars[day.tm_year] = _cached_trading_days(day.tm_year)
+        days = calendars[day.tm_year]
+        if (date in days) if days else day.tm_wday < 5:
+            return date
+        local -= 86400
+    return date
+
+
+def _cached_trading_days(year):
+    """本地缓存中 year 年的交易日集合，没有缓存时返回空集合。"""
+    data = load_payload(os.path.join(CACHE_DIR, "trading_days_%d.json" % year))
+    if isinstance(data, dict):
+        data = data.get("days")
+    return set(data) if isinstance(data, list) else set()
+
+
+def extend_cache(path, cache_name, expires_at):
+    """把已有缓存条目的有效期延长到 expires_at（如预热确认新数据已发布后）。"""
+    cache_file = os.path.join(CACHE_DIR, cache_name)
+    meta = _load_meta(cache_file, path)
+    if meta and os.path.exists(cache_file):
+        meta["expires_at"] = expires_at
+        _write_meta(cache_file, meta)
+        if path in _MEMORY:
+            _MEMORY[path]["expires_at"] = expires_at
+
+
+def _meta_path(cache_file):
+    return cache_file + ".meta"
+
+
+# ── 重试 / 对冲 / 熔断 ──────────────────────────────────────
+
+# 每次 fetch_json 的网络部分有总时限（HHXG_DEADLINE 秒），时限内失败按指数退避 + 随机抖动重试，
+# 最坏情况约 FETCH_DEADLINE 秒后转入缓存兜底（含读取响应体）。写错或为 0 时用默认 10 秒
+FETCH_DEADLINE = _env_seconds("HHXG_DEADLINE") or 10
+ATTEMPT_TIMEOUT = 4         # 单次请求的 socket 超时上限，黑洞连接也能在时限内再试
+RETRY_BASE = 0.25           # 第 n 次重试前等待 uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE * 2^(n-1))) 秒
+RETRY_MAX_DELAY = 2.0
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 对冲请求（HHXG_HEDGE=1 开启）：首个请求超过该数据近期耗时的 HEDGE_PERCENTILE 分位仍未返回时，
+# 再并发发一个，先到先用
+HEDGE = os.environ.get("HHXG_HEDGE") == "1"
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 1.0   # 耗时样本不足时的对冲等待（秒）
+HEDGE_MIN_DELAY = 0.05
+LATENCY_SAMPLES = 50        # 每个 path 保留的最近耗时样本数
+
+# 熔断：同一 host 连续 BREAKER_THRESHOLD 次请求失败后冷却 BREAKER_COOLDOWN 秒，期间不发请求直接用缓存；
+# 冷却结束放行一次探测，仍失败则冷却时间翻倍（最长 BREAKER_MAX_COOLDOWN）。状态多进程共享
+BREAKER_THRESHOLD = 4
+BREAKER_COOLDOWN = 30
+BREAKER_MAX_COOLDOWN = 300
+UPSTREAM_STATE = "upstream.bin"
+
+_UPSTREAM = None
+
+
+def _host_of(url):
+    from urllib.parse import urlsplit
+
+    return urlsplit(url).netloc
+
+
+def _get_upstream():
+    global _UPSTREAM
+    if _UPSTREAM is None:
+        _UPSTREAM = UpstreamHealth()
+    return _UPSTREAM
+
+
+def _backoff(attempt):
+    """第 attempt 次失败后的等待秒数。全区间随机抖动，避免多个进程步调一致地重试。"""
+    import random
+
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE * 2 ** (attempt - 1)))
+
+
+def _request(url, headers, path, deadline):
+    """在 deadline（monotonic）前发一次 GET，HEDGE 开启时可能并发补发。Returns (status, headers, body)。"""
+    timeout = max(0.01, min(ATTEMPT_TIMEOUT, deadline - time.monotonic()))
+    if not HEDGE:
+        return _get_pool().get(url, headers, path, timeout=timeout, deadline=deadline)
+    return _hedged_get(url, headers, path, timeout, deadline)
+
+
+def _hedged_get(url, headers, path, timeout, deadline):
+    """对冲请求：首个请求在近期耗时分位数内未返回就再发一个，取先成功的结果。
+
+    落后的请求不取消，跑完后连接照常回到连接池；两个都失败时抛出后失败的异常。
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    pool = _get_pool()
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        pending = {executor.submit(pool.get, url, headers, path, timeout, deadline)}
+        done, _ = wait(pending, timeout=min(_get_upstream().hedge_delay(path), timeout))
+        if not done:
+            remaining = max(0.01, min(timeout, deadline - time.monotonic()))
+            pending.add(executor.submit(pool.get, url, headers, path, remaining, deadline))
+        error = None
+        while pending:
+            done, pending = wait(
+                pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                raise TimeoutError("请求超过总时限")
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        executor.shutdown(wait=False)
+
+
+class UpstreamHealth:
+    """上游健康状态：按 host 记连续失败次数和熔断截止时间，按 path 记最近成功请求的耗时（供对冲取分位数）。
+
+    存于 CACHE_DIR/UPSTREAM_STATE（marshal），每次读写前按 mtime 重新加载，
+    各脚本进程与守护进程看到同一份状态；并发写入时后写覆盖先写，对熔断判断足够。
+    """
+
+    def __init__(self):
+        import threading
+
+        self._lock = threading.Lock()
+        self._state = {"hosts": {}, "latency": {}}
+        self._mtime = None
+
+    @property
+    def path(self):
+        return os.path.join(CACHE_DIR, UPSTREAM_STATE)
+
+    def _reload(self):
+        import marshal
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                state = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if isinstance(state, dict):
+            self._state = {"hosts": state.get("hosts", {}), "latency": state.get("latency", {})}
+            self._mtime = mtime
+
+    def _save(self):
+        import marshal
+
+        try:
+            _atomic_write(self.path, marshal.dumps(self._state))
+            self._mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            pass  # 状态写不进去只影响熔断，不影响本次请求
+
+    def allow(self, host):
+        """该 host 当前能否发请求。冷却期刚结束时只放行一个探测，其余调用继续走缓存。"""
+        now = time.time()
+        with self._lock:
+            self._reload()
+            h = self._state["hosts"].get(host)
+            if not h or h["failures"] < BREAKER_THRESHOLD:
+                return True
+            if h["open_until"] > now:
+                return False
+            # 半开：占住一个请求超时的窗口给本次探测
+            h["open_until"] = now + ATTEMPT_TIMEOUT
+            self._save()
+            return True
+
+    def remaining(self, host):
+        """熔断剩余秒数，未熔断为 0。"""
+        h = self._state["hosts"].get(host)
+        if not h or h["failures"] < BREAKER_THRESHOLD:
+            return 0
+        return max(0, h["open_until"] - time.time())
+
+    def record(self, host, path, ok, elapsed=None):
+        with self._lock:
+            self._reload()
+            hosts = self._state["hosts"]
+            if ok:
+                hosts.pop(host, None)
+                if elapsed is not None:
+                    samples = self._state["latency"].setdefault(path, [])
+                    samples.append(round(elapsed, 4))
+                    del samples[:-LATENCY_SAMPLES]
+            else:
+                h = hosts.setdefault(host, {"failures": 0, "open_until": 0})
+                h["failures"] += 1
+                if h["failures"] >= BREAKER_THRESHOLD:
+                    extra = h["failures"] - BREAKER_THRESHOLD
+                    h["open_until"] = time.time() + min(BREAKER_MAX_COOLDOWN, BREAKER_COOLDOWN * 2 ** extra)
+            self._save()
+
+    def hedge_delay(self, path):
+        """对冲等待秒数：该 path 近期耗时的 HEDGE_PERCENTILE 分位，样本不足时用 HEDGE_DEFAULT_DELAY。"""
+        with self._lock:
+            self._reload()
+            samples = sorted(self._state["latency"].get(path, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, samples[int(HEDGE_PERCENTILE * (len(samples) - 1))])
+
+
+# ── HTTP 连接池 ─────────────────────────────────────────────
+
+POOL_IDLE_TIMEOUT = 30      # 空闲超过 30 秒的连接直接丢弃，避免撞上服务端 keep-alive 超时
+POOL_MAX_IDLE = 4           # 每个 host 最多保留的空闲连接数
+MAX_REDIRECTS = 3
+
+_POOL = None
+
+
+def _http_errors():
+    import http.client
+    return http.client.HTTPException
+
+
+def _get_pool():
+    global _POOL
+    if _POOL is None:
+        _POOL = ConnectionPool()
+    return _POOL
+
+
+class ConnectionPool:
+    """按 (scheme, host, port) 复用 keep-alive 连接的 HTTP(S) 客户端，线程安全。
+
+    复用的空闲连接若已被服务端关闭（reset / 空响应），自动换新连接重发一次，
+    不计入 fetch_json 的重试次数。
+    """
+
+    def __init__(self, idle_timeout=POOL_IDLE_TIMEOUT, max_idle=POOL_MAX_IDLE):
+        import threading
+
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def get(self, url, headers, path, timeout=15, deadline=None):
+        """发送 GET 请求，跟随重定向。Returns (status, headers, body)。
+
+        200 响应的 body 已按 Content-Encoding 解压；其他状态 body 为原始字节。
+        deadline（monotonic）给定时，读取响应体超过它即抛 TimeoutError。
+        """
+        from urllib.parse import urljoin
+
+        for _ in range(MAX_REDIRECTS + 1):
+            status, resp_headers, body = self._send(url, headers, path, timeout, deadline)
+            location = resp_headers.get("Location")
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return status, resp_headers, body
+        return status, resp_headers, body
+
+    def close(self):
+        """关闭所有空闲连接。"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    def _send(self, url, headers, path, timeout, deadline=None):
+        import http.client
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+                if resp.status == 200:
+                    body = _read_body(resp, path, deadline, conn.sock)
+                else:
+                    body = resp.read()
+            except (ConnectionError, http.client.BadStatusLine):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return resp.status, resp.headers, body
+
+    def _acquire(self, key, timeout):
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with self._lock:
+            conns = self._idle.get(key, [])
+            while conns:
+                candidate, last_used = conns.pop()
+                if now - last_used < self.idle_timeout:
+                    conn = candidate
+                    break
+                stale.append(candidate)
+        for old in stale:
+            old.close()
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        return self._connect(key, timeout), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle:
+                conns.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    @staticmethod
+    def _connect(key, timeout):
+        import http.client
+
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        proxy = _proxy_for(scheme, host)
+        if proxy is None:
+            return cls(host, port, timeout=timeout)
+        # 与 urllib 一致遵循代理设置，通过 CONNECT 隧道访问目标；代理 URL 带账号时附上 Proxy-Authorization
+        conn = cls(proxy.hostname, proxy.port or 8080, timeout=timeout)
+        conn.set_tunnel(host, port, headers=_proxy_headers(proxy))
+        return conn
+
+
+def _proxy_for(scheme, host):
+    """按 urllib 的规则取代理：*_proxy 环境变量，未设置时读 macOS / Windows 系统代理；命中例外返回 None。"""
+    from urllib.parse import urlsplit
+    from urllib.request import getproxies, proxy_bypass
+
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(host):
+        return None
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    return urlsplit(proxy)
+
+
+def _proxy_headers(proxy):
+    """代理 URL 中的 user:pass 转成 Basic 认证头。"""
+    if proxy.username is None:
+        return None
+    import base64
+    from urllib.parse import unquote
+
+    credentials = "%s:%s" % (unquote(proxy.username), unquote(proxy.password or ""))
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")}
+
+
+def _accept_encoding():
+    """gzip 走标准库 zlib；装了 brotli 包时额外声明 br。"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return "gzip"
+    return "br, gzip"
+
+
+def _read_body(resp, path, deadline=None, sock=None):
+    """按 Content-Encoding 分块解压响应体，并记录传输字节数与解压后大小。
+
+    每块读取前检查 deadline，并把 sock 的超时收紧到剩余时间，慢速滴流的响应不会拖过总时限。
+    """
+    encoding = (resp.headers.get("Content-Encoding") or "identity").strip().lower()
+    if encoding == "gzip":
+        import zlib
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        feed, flush, errors = decoder.decompress, decoder.flush, zlib.error
+    elif encoding == "br":
+        import brotli
+        decoder = brotli.Decompressor()
+        feed, flush, errors = decoder.process, bytes, brotli.error
+    elif encoding == "identity":
+        feed, flush, errors = bytes, bytes, ()
+    else:
+        raise RuntimeError("不支持的压缩格式 %s，请升级技能" % encoding)
+
+    parts = []
+    wire = 0
+    try:
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("读取响应超过总时限")
+                if sock is not None:
+                    sock.settimeout(min(sock.gettimeout() or remaining, remaining))
+            chunk = resp.read1(CHUNK_SIZE)  # read() 会凑满 CHUNK_SIZE 才返回，滴流时查不到时限
+            if not chunk:
+                break
+            wire += len(chunk)
+            parts.append(feed(chunk))
+        parts.append(flush())
+        # read1() 读完 Content-Length 后不会像 read() 那样关闭响应，不关掉连接就无法复用
+        resp.close()
+    except errors:
+        raise RuntimeError("数据格式异常，服务端可能在维护，请稍后重试")
+    body = b"".join(parts)
+
+    stat = {"path": path, "encoding": encoding, "wire_bytes": wire, "decoded_bytes": len(body)}
+    TRANSFER_STATS.append(stat)
+    if DEBUG:
+        ratio = 100.0 * wire / len(body) if body else 100.0
+        print(
+            "[hhxg] %s: %s 传输 %d B / 解压后 %d B (%.1f%%)"
+            % (path, encoding, wire, len(body), ratio),
+            file=sys.stderr,
+        )
+    return body
+
+
+def _validators(headers):
+    """提取响应头中的 ETag / Last-Modified，供下次条件请求使用。"""
+    found = {}
+    if headers is None:
+        return found
+    if headers.get("ETag"):
+        found["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        found["last_modified"] = headers["Last-Modified"]
+    return found
+
+
+def _save_meta(cache_file, path, extra=None, data=None):
+    """写缓存元数据；extra 中的 ETag / Last-Modified / 数据校验和会一并保留，data 用于判断有效期（见 cache_ttl）。"""
+    now = time.time()
+    meta = {"path": path, "fetched_at": now, "expires_at": cache_ttl(path, now, data)}
+    if extra:
+        for key in ("etag", "last_modified", "crc32"):
+            if extra.get(key) is not None:
+                meta[key] = extra[key]
+    _write_meta(cache_file, meta)
+
+
+def _write_meta(cache_file, meta):
+    import marshal
+
+    try:
+        _atomic_write(_meta_path(cache_file), marshal.dumps(meta))
+    except OSError:
+        pass
+
+
+def _load_meta(cache_file, path):
+    """读取缓存元数据，path 不一致（如跨年复用文件名）视为无缓存。
+
+    元数据用 marshal 存放，缓存命中路径不必导入 json。
+    """
+    import marshal
+
+    try:
+        with open(_meta_path(cache_file), "rb") as f:
+            meta = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(meta, dict) or meta.get("path") != path:
+        return None
+    return meta
+
+
+def _atomic_write(path, blob):
+    """先写同目录临时文件再 rename，进程中途被杀也不会留下半截文件。"""
+    import tempfile
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def _save_cache(path, data):
+    import json
+
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
+        _atomic_write(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
     except OSError:
         pass
 
 
 def _load_cache(path):
+    import json
+
     try:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
-    except (OSError, json.JSONDecodeError):
+    except (OSError, ValueError):
+        return None
+
+
+# ── 数据缓存：可移植 JSON + 快速加载的 marshal 副本 ─────────────
+#
+# <name>        JSON 原文（服务端响应体原样落盘），meta 中记录其 crc32
+# <name>.bin    4 字节头部长度（小端）+ marshal 序列化的头部 + marshal 序列化的解析结果
+#
+# 数据为 dict 时按顶层 key 分片：每个 value 单独 marshal 后依次拼接，头部
+# {v, tag, json_crc32, keys: {key: [offset, size, crc32]}} 即分片清单，
+# 只需要部分字段时按清单 seek 读取对应分片，其余分片不读也不解码。
+# 其他数据整体存放，头部为 {v, tag, json_crc32, crc32, size}。
+# 头部同样用 marshal，缓存命中时整个读取过程不导入 json。
+#
+# .bin 只在头部 tag 与当前解释器一致、json_crc32 与 meta 对得上、crc32 校验通过时使用，
+# 否则回退到 JSON 并顺手重建。
+
+FAST_VERSION = 3
+
+
+def _fast_path(cache_file):
+    return cache_file + ".bin"
+
+
+def _save_payload(cache_file, data, raw=None):
+    """原子写入 JSON 及其 marshal 副本，返回 JSON 的 crc32（写入失败返回 None）。"""
+    import json
+    import zlib
+
+    if raw is None:
+        raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    json_crc = zlib.crc32(raw)
+    try:
+        _atomic_write(cache_file, raw)
+    except OSError:
+        return None
+    _save_fast(cache_file, data, json_crc)
+    return json_crc
+
+
+def _save_fast(cache_file, data, json_crc):
+    import marshal
+    import zlib
+
+    header = {
+        "v": FAST_VERSION,
+        "tag": sys.implementation.cache_tag,
+        "json_crc32": json_crc,
+    }
+    try:
+        if isinstance(data, dict):
+            chunks = [marshal.dumps(v) for v in data.values()]
+            manifest, offset = {}, 0
+            for key, chunk in zip(data, chunks):
+                manifest[key] = [offset, len(chunk), zlib.crc32(chunk)]
+                offset += len(chunk)
+            header["keys"] = manifest
+            body = b"".join(chunks)
+        else:
+            body = marshal.dumps(data)
+            header["crc32"] = zlib.crc32(body)
+            header["size"] = len(body)
+    except ValueError:
+        return
+    head = marshal.dumps(header)
+    try:
+        _atomic_write(_fast_path(cache_file), len(head).to_bytes(4, "little") + head + body)
+    except OSError:
+        pass
+
+
+def _load_fast(cache_file, json_crc, keys=None):
+    import marshal
+    import zlib
+
+    try:
+        with open(_fast_path(cache_file), "rb") as f:
+            size = int.from_bytes(f.read(4), "little")
+            header = marshal.loads(f.read(size))
+            if not isinstance(header, dict) or (
+                header.get("v") != FAST_VERSION
+                or header.get("tag") != sys.implementation.cache_tag
+                or header.get("json_crc32") != json_crc
+            ):
+                return None
+            manifest = header.get("keys")
+            if manifest is None:
+                body = f.read()
+                if header.get("size") != len(body) or header.get("crc32") != zlib.crc32(body):
+                    return None
+                return marshal.loads(body)
+            base = f.tell()
+            wanted = manifest if keys is None else [k for k in keys if k in manifest]
+            # 整份读取时一次读完再切片，部分读取时逐个 seek
+            body = f.read() if keys is None else None
+            data = {}
+            for key in wanted:
+                offset, size, crc = manifest[key]
+                if body is None:
+                    f.seek(base + offset)
+                    chunk = f.read(size)
+                else:
+                    chunk = body[offset:offset + size]
+                if len(chunk) != size or zlib.crc32(chunk) != crc:
+                    return None
+                data[key] = marshal.loads(chunk)
+            return data
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def load_payload(cache_file, meta=None, keys=None):
+    """读取缓存数据：优先 marshal 副本，校验不过时回退到 JSON。损坏或不存在返回 None。
+
+    keys 指定顶层字段时只解码这些分片，返回的 dict 至少包含其中存在的字段
+    （回退到 JSON 时返回完整数据）。
+    """
+    json_crc = (meta or {}).get("crc32")
+    if json_crc is not None:
+        data = _load_fast(cache_file, json_crc, keys)
+        if data is not None:
+            return data
+    try:
+        with open(cache_file, "rb") as f:
+            raw = f.read()
+    except OSError:
         return None
+    import json
+
+    try:
+        data = json.loads(raw.decode("utf-8"))
+    except ValueError:
+        return None
+    if json_crc is not None:
+        import zlib
+
+        # JSON 与 meta 一致但副本缺失或过期（如升级了 Python），重建副本
+        if zlib.crc32(raw) == json_crc:
+            _save_fast(cache_file, data, json_crc)
+    return data
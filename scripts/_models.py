@@ -0,0 +1,232 @@
+"""日报快照的紧凑数据模型：按 references/data-schema.md 把嵌套 dict 解析成 __slots__ 对象。
+
+每行数据（连板股、席位个股、板块、题材龙头……）从一个 dict 变成一个定长的 slots 对象，
+股票名、代码、行业、地域、概念等高度重复的字符串经 sys.intern 去重，
+同一只股票在几十个交易日里只占一份字符串。内存中保留数月快照（history / 常驻进程）时开销明显下降。
+
+模型对象兼容 dict 的读取方式（.get(key, default)、obj[key]、key in obj），
+_snapshot_fmt 里的 formatter 可以直接接收 Snapshot。每个 slot 都会赋值：缺失字段取类上 _defaults
+里的默认值，没有默认值的为 None，读取时 None 与缺失等同（.get 返回调用方给的 default）。
+slot 全部有值，热点循环可以直接读属性，省掉 dict.get 的方法调用。
+没有固定结构的映射（lb_rates_map、area_counts、links 等）仍保留为 dict，只对键做 intern。
+"""
+from __future__ import annotations
+
+import sys
+
+_intern = sys.intern
+
+
+class Model:
+    """slots 模型基类。
+
+    子类声明 __slots__、_children（字段 -> 子模型类）、_interned（需 intern 的字符串字段）
+    和 _defaults（缺失字段的默认值，其余缺失字段为 None）。
+    """
+
+    __slots__ = ()
+    _children = {}
+    _interned = frozenset()
+    _defaults = {}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls.__new__(cls)
+        for key, value in cls._blank:
+            setattr(obj, key, value)
+        fields = cls._fields
+        children = cls._children
+        interned = cls._interned
+        for key, value in d.items():
+            if key not in fields:
+                continue
+            if key in children:
+                value = _parse_child(children[key], value)
+            elif key in interned and type(value) is str:
+                value = _intern(value)
+            elif type(value) is dict:
+                value = _intern_keys(value)
+            setattr(obj, key, value)
+        return obj
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in self._fields else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in self._fields else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self._fields and getattr(self, key) is not None
+
+    def keys(self):
+        return [k for k in self.__slots__ if getattr(self, k) is not None]
+
+    def to_dict(self):
+        """还原成与原始 JSON 同结构的 dict（用于 --json 输出等）；None 字段省略，缺失字段带上默认值。"""
+        return {key: _plain(getattr(self, key)) for key in self.keys()}
+
+    def __repr__(self):
+        shown = ", ".join("%s=%r" % (k, getattr(self, k)) for k in self.keys()[:3])
+        return "%s(%s)" % (type(self).__name__, shown)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.__slots__)
+        cls._blank = tuple((key, cls._defaults.get(key)) for key in cls.__slots__)
+
+
+def _parse_child(model, value):
+    if type(value) is list:
+        return [model.from_dict(v) if type(v) is dict else v for v in value]
+    if type(value) is dict:
+        return model.from_dict(value)
+    return value  # null 或意外类型原样保留，formatter 自行兜底
+
+
+def _intern_keys(d):
+    return {(_intern(k) if type(k) is str else k): v for k, v in d.items()}
+
+
+def _plain(value):
+    if isinstance(value, Model):
+        return value.to_dict()
+    if type(value) is list:
+        return [_plain(v) for v in value]
+    return value
+
+
+# ── 叶子实体 ────────────────────────────────────────────────
+
+
+class Stock(Model):
+    """连板股 / 最高连板股：{name, code, industry, area, concept, is_success}"""
+    __slots__ = ("name", "code", "industry", "area", "concept", "is_success")
+    _interned = frozenset(("name", "code", "industry", "area", "concept"))
+    _defaults = {"name": "", "industry": "", "is_success": True}
+
+
+class StockNet(Model):
+    """题材龙头、席位个股：{name, net_yi}"""
+    __slots__ = ("name", "net_yi")
+    _interned = frozenset(("name",))
+
+
+class NetBuy(Model):
+    """龙虎榜净买入 TOP：{name, net_yi, ratio_pct}"""
+    __slots__ = ("name", "net_yi", "ratio_pct")
+    _interned = frozenset(("name",))
+
+
+class SectorItem(Model):
+    __slots__ = ("name", "net_yi", "leader", "bias_pct")
+    _interned = frozenset(("name", "leader"))
+
+
+class Bucket(Model):
+    __slots__ = ("name", "count", "prev", "dir")
+    _interned = frozenset(("name", "dir"))
+
+
+class NewsItem(Model):
+    __slots__ = ("t", "cat", "title")
+    _interned = frozenset(("cat",))
+
+
+# ── 板块 ────────────────────────────────────────────────────
+
+
+class Theme(Model):
+    __slots__ = ("name", "limitup_count", "net_yi", "top_stocks")
+    _children = {"top_stocks": StockNet}
+    _interned = frozenset(("name",))
+
+
+class SectorGroup(Model):
+    __slots__ = ("label", "strong", "weak")
+    _children = {"strong": SectorItem, "weak": SectorItem}
+    _interned = frozenset(("label",))
+
+
+class Level(Model):
+    __slots__ = ("boards", "count", "fail_count", "stocks")
+    _children = {"stocks": Stock}
+
+
+class Ladder(Model):
+    __slots__ = ("total_limit_up", "max_streak", "top_streak")
+    _children = {"top_streak": Stock}
+
+
+class LadderDetail(Model):
+    __slots__ = ("levels", "lb_rates_map", "area_counts", "concept_counts")
+    _children = {"levels": Level}
+
+
+class Seat(Model):
+    __slots__ = ("name", "stocks")
+    _children = {"stocks": StockNet}
+    _interned = frozenset(("name",))
+
+
+class Hotmoney(Model):
+    __slots__ = ("date", "total_net_yi", "top_net_buy", "seats")
+    _children = {"top_net_buy": NetBuy, "seats": Seat}
+    _interned = frozenset(("date",))
+
+
+class Market(Model):
+    __slots__ = (
+        "date", "sentiment_index", "sentiment_label", "limit_up", "fried", "limit_down",
+        "struct_diff", "promotion_rate", "total", "buckets",
+    )
+    _children = {"buckets": Bucket}
+    _interned = frozenset(("date", "sentiment_label"))
+
+
+class AiSummary(Model):
+    __slots__ = ("market_state", "focus_direction", "theme_focus", "hotmoney_state", "news_highlight", "cta")
+
+
+class Comparison(Model):
+    __slots__ = ("yesterday", "trend_label", "trend_url")
+    _interned = frozenset(("trend_url",))
+
+
+class Snapshot(Model):
+    """一天的日报快照。只含 fetch_json(keys=...) 部分字段时，其余字段视为缺失。"""
+    __slots__ = (
+        "meta", "date", "disclaimer", "ai_summary", "market", "hot_themes", "sectors",
+        "ladder", "ladder_detail", "hotmoney", "focus_news", "macro_news",
+        "comparison", "signals_count", "links",
+    )
+    _children = {
+        "ai_summary": AiSummary,
+        "market": Market,
+        "hot_themes": Theme,
+        "sectors": SectorGroup,
+        "ladder": Ladder,
+        "ladder_detail": LadderDetail,
+        "hotmoney": Hotmoney,
+        "focus_news": NewsItem,
+        "macro_news": NewsItem,
+        "comparison": Comparison,
+    }
+    _interned = frozenset(("date", "disclaimer"))
+
+
+def parse_snapshot(data):
+    """把 fetch_snapshot.fetch() / 归档里的快照 dict 解析成 Snapshot（已是 Snapshot 时原样返回）。"""
+    if isinstance(data, Snapshot):
+        return data
+    return Snapshot.from_dict(data)
+
+
+def snapshot_history(since=None, until=None, last=None):
+    """从本地归档读取区间内的日报快照并解析成模型。Returns [(date, Snapshot), ...]，按日期升序。"""
+    import _archive
+
+    return [(date, Snapshot.from_dict(data)) for date, data in _archive.query("snapshot", since=since, until=until, last=last)]
@@ -0,0 +1,422 @@
+"""本地快讯库：累积保存拉取过的快讯，并用字符二元组倒排索引做离线全文检索。
+
+目录结构（位于 CACHE_DIR/archive/news/）：
+    items.jsonl     追加写入的快讯，每行 {"t", "cat", "title"}，行号即文档编号
+    index.bin       一行 JSON 头 {v, tag, size, count} + marshal 序列化的 {columns, postings}
+                    size 为已建索引的 items.jsonl 字节数；columns 按 t/cat/title 分列，
+                    每列是拼接后的字符串 + 结束偏移；postings 为 {bigram: array('I') 字节}
+    keys.bin        去重用的近期键集合（marshal）{v, size, floor, keys}：items.jsonl 前 size 字节中
+                    时间不早于 floor 的全部 (t, title)，floor 随最新快讯前移 KEY_WINDOW_DAYS 天
+
+标题先归一化（小写、去空白和标点）再切成相邻两字的 bigram，中英文一视同仁。
+查询取 query 的全部 bigram 求倒排交集，再对候选做子串校验去掉误命中。
+新快讯只追加到 items.jsonl；index.bin 之后的尾部在查询时现场补建，
+尾部超过 REINDEX_EVERY 条时才在后台重写 index.bin。库超过 RETAIN_ITEMS 条时在重建索引时
+按时间丢掉最旧的，只留 RETAIN_KEEP 条。
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import marshal
+import os
+import sys
+from array import array
+
+import _archive
+import _common
+
+INDEX_VERSION = 1
+REINDEX_EVERY = 500
+RETAIN_ITEMS = 100000       # 快讯库上限，超过后在重建索引时裁剪到 RETAIN_KEEP 条
+RETAIN_KEEP = 90000
+KEYS_VERSION = 1
+KEY_WINDOW_DAYS = 3         # keys.bin 保留最新快讯往前这么多天的键；更早的入库请求退回全文件扫描
+_TYPECODE = "I"
+
+
+def store_dir():
+    return _archive.archive_dir("news")
+
+
+def normalize(text):
+    """小写并只保留字母、数字和汉字等字符，去掉空白与标点。"""
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def bigrams(norm):
+    return {norm[i:i + 2] for i in range(len(norm) - 1)}
+
+
+FIELDS = ("t", "cat", "title")
+
+
+class _Column:
+    """一列字符串打包成单个 str + 结束偏移数组，加载时不必逐条创建对象。"""
+
+    def __init__(self, text="", ends=b""):
+        self.text = text
+        self.ends = _from_bytes(ends)
+
+    @classmethod
+    def pack(cls, values):
+        col = cls()
+        col.text = "".join(values)
+        pos = 0
+        for v in values:
+            pos += len(v)
+            col.ends.append(pos)
+        return col
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, i):
+        return self.text[self.ends[i - 1] if i else 0:self.ends[i]]
+
+
+class Store:
+    """内存中的快讯库：已建索引的文档按列打包存放，尾部新增的文档放在 tail 列表里。
+
+    从 index.bin 读入的倒排表先保留为字节串，查询或追加用到时才转成 array，
+    加载开销基本只剩一次 marshal.loads。
+    """
+
+    def __init__(self):
+        self.columns = {f: _Column() for f in FIELDS}
+        self.tail = []      # 未写进 index.bin 的 (t, cat, title)
+        self.postings = {}
+        self.size = 0       # 已读入的 items.jsonl 字节数
+
+    @property
+    def indexed(self):
+        return len(self.columns["t"])
+
+    def __len__(self):
+        return self.indexed + len(self.tail)
+
+    def doc(self, i):
+        """Returns (t, cat, title)。"""
+        if i >= self.indexed:
+            return self.tail[i - self.indexed]
+        return tuple(self.columns[f][i] for f in FIELDS)
+
+    def docs(self):
+        return [self.doc(i) for i in range(len(self))]
+
+    def _posting(self, gram, create=False):
+        posting = self.postings.get(gram)
+        if isinstance(posting, bytes):
+            posting = self.postings[gram] = _from_bytes(posting)
+        elif posting is None and create:
+            posting = self.postings[gram] = array(_TYPECODE)
+        return posting
+
+    def _add_doc(self, t, cat, title):
+        doc_id = len(self)
+        self.tail.append((t, cat, title))
+        for gram in bigrams(normalize(title)):
+            self._posting(gram, create=True).append(doc_id)
+
+    def _read_tail(self, path):
+        """把 items.jsonl 中 size 之后新增的完整行补进内存索引。"""
+        try:
+            with open(path, "rb") as f:
+                f.seek(self.size)
+                tail = f.read()
+        except OSError:
+            return
+        end = tail.rfind(b"\n") + 1  # 写到一半的尾行留给下次
+        for line in tail[:end].splitlines():
+            try:
+                n = json.loads(line)
+            except ValueError:
+                continue
+            self._add_doc(n.get("t", ""), n.get("cat", ""), n.get("title", ""))
+        self.size += end
+
+    def search(self, query, cat=None, since=None, limit=20):
+        """标题包含 query（空格分隔的多个词取交集）的快讯，可按分类、起始日期过滤。
+
+        入库顺序不等于时间顺序（批次可能乱序追加），因此检查全部候选，
+        再按时间倒序取前 limit 条。
+        """
+        # 空格分隔的多个词须同时出现
+        terms = [t for t in (normalize(w) for w in query.split()) if t]
+        if not terms:
+            return []
+        grams = set().union(*(bigrams(t) for t in terms))
+        if grams:
+            lists = []
+            for gram in grams:
+                posting = self._posting(gram)
+                if not posting:
+                    return []
+                lists.append(posting)
+            lists.sort(key=len)
+            candidates = set(lists[0]).intersection(*lists[1:]) if len(lists) > 1 else lists[0]
+            candidates = sorted(candidates, reverse=True)
+        else:
+            # 全是单字词时没有 bigram，退化为顺序扫描
+            candidates = range(len(self) - 1, -1, -1)
+        hits = []
+        for i in candidates:
+            t, c, title = self.doc(i)
+            if (cat and c != cat) or (since and t < since):
+                continue
+            norm = normalize(title)
+            if not all(term in norm for term in terms):
+                continue
+            hits.append({"t": t, "cat": c, "title": title})
+        if limit:
+            return heapq.nlargest(limit, hits, key=lambda n: n["t"])
+        hits.sort(key=lambda n: n["t"], reverse=True)
+        return hits
+
+
+def _from_bytes(blob):
+    posting = array(_TYPECODE)
+    posting.frombytes(blob)
+    return posting
+
+
+def _index_path():
+    return os.path.join(store_dir(), "index.bin")
+
+
+def _items_path():
+    return os.path.join(store_dir(), "items.jsonl")
+
+
+def _load_index():
+    """读取 index.bin，版本/解释器不符或损坏时返回空库（随后从 items.jsonl 全量重建）。"""
+    store = Store()
+    try:
+        with open(_index_path(), "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("v") != INDEX_VERSION or header.get("tag") != sys.implementation.cache_tag:
+                return store
+            payload = marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return store
+    store.columns = {f: _Column(*payload["columns"][f]) for f in FIELDS}
+    store.postings = payload["postings"]
+    store.size = header["size"]
+    return store
+
+
+def _save_index(store):
+    header = {
+        "v": INDEX_VERSION,
+        "tag": sys.implementation.cache_tag,
+        "size": store.size,
+        "count": len(store),
+    }
+    docs = store.docs()
+    columns = {f: _Column.pack([d[k] for d in docs]) for k, f in enumerate(FIELDS)}
+    payload = {
+        "columns": {f: (col.text, col.ends.tobytes()) for f, col in columns.items()},
+        "postings": {
+            gram: posting if isinstance(posting, bytes) else posting.tobytes()
+            for gram, posting in store.postings.items()
+        },
+    }
+    blob = json.dumps(header).encode("utf-8") + b"\n" + marshal.dumps(payload)
+    _common._atomic_write(_index_path(), blob)
+    store.columns, store.tail = columns, []
+
+
+def load():
+    """加载快讯库（index.bin + 未建索引的尾部），不访问网络。"""
+    store = _load_index()
+    store._read_tail(_items_path())
+    return store
+
+
+def _index_size():
+    """只读 index.bin 头部，Returns 已建索引的 items.jsonl 字节数（不可用时为 0）。"""
+    try:
+        with open(_index_path(), "rb") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return 0
+    if header.get("v") != INDEX_VERSION or header.get("tag") != sys.implementation.cache_tag:
+        return 0
+    return header.get("size", 0)
+
+
+def _keys_path():
+    return os.path.join(store_dir(), "keys.bin")
+
+
+_T_PREFIX = b'{"t": "'
+
+
+def _scan_keys(data, floor):
+    """从 items.jsonl 的字节内容里收集时间不早于 floor 的 (t, title)。
+
+    每行都由 add() 以 {"t": ...} 开头写入，先按字节切出时间比较，只对够新的行做 json 解析。
+    文件顺序不等于时间顺序（批次可能乱序追加），因此整段扫描，不能读到更早的条目就停。
+    """
+    known = set()
+    cut = floor.encode("utf-8")
+    start = len(_T_PREFIX)
+    for line in data.splitlines():
+        if line.startswith(_T_PREFIX) and line[start:line.find(b'"', start)] < cut:
+            continue
+        try:
+            n = json.loads(line)
+        except ValueError:
+            continue
+        t = n.get("t", "")
+        if t >= floor:
+            known.add((t, n.get("title", "")))
+    return known
+
+
+def _key_floor(newest):
+    """newest 往前 KEY_WINDOW_DAYS 天的日期（YYYY-MM-DD），作为 keys.bin 的下界。"""
+    from datetime import date, timedelta
+
+    try:
+        day = date.fromisoformat(newest[:10])
+    except ValueError:
+        return ""
+    return (day - timedelta(days=KEY_WINDOW_DAYS)).isoformat()
+
+
+def _load_keys(oldest):
+    """Returns (known, state)：known 至少包含库中时间不早于 oldest 的全部 (t, title)。
+
+    平时只读 keys.bin 和它之后追加的几行；keys.bin 缺失、损坏或与 items.jsonl 对不上
+    （被裁剪过）时重新扫描整个 items.jsonl。oldest 早于 floor 时另外整段扫描更早的键，只用于本次去重。
+    state 为写回 keys.bin 的 {v, size, floor, keys}，state["dirty"] 表示与磁盘上的不同。
+    """
+    import marshal
+
+    state = None
+    try:
+        with open(_keys_path(), "rb") as f:
+            state = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    if not isinstance(state, dict) or state.get("v") != KEYS_VERSION:
+        state = {"v": KEYS_VERSION, "size": 0, "floor": "", "keys": set()}
+    try:
+        f = open(_items_path(), "rb")
+    except OSError:
+        state.update(size=0, keys=set(), dirty=True)
+        return set(), state
+    with f:
+        if state["size"] > f.seek(0, os.SEEK_END):
+            state.update(size=0, floor="", keys=set())
+        f.seek(state["size"])
+        tail = f.read()
+        end = tail.rfind(b"\n") + 1  # 写到一半的尾行留给下次
+        state["dirty"] = end > 0
+        if end:
+            state["keys"] |= _scan_keys(tail[:end], state["floor"])
+            state["size"] += end
+        if oldest >= state["floor"]:
+            return state["keys"], state
+        f.seek(0)
+        return state["keys"] | _scan_keys(f.read(state["size"]), oldest), state
+
+
+def _save_keys(state):
+    """把 floor 前移到最新快讯往前 KEY_WINDOW_DAYS 天，丢掉更早的键后写回 keys.bin。"""
+    import marshal
+
+    keys = state["keys"]
+    if keys:
+        floor = max(state["floor"], _key_floor(max(t for t, _ in keys)))
+        if floor != state["floor"]:
+            state["keys"] = {k for k in keys if k[0] >= floor}
+            state["floor"] = floor
+    blob = marshal.dumps({k: state[k] for k in ("v", "size", "floor", "keys")})
+    _common._atomic_write(_keys_path(), blob)
+
+
+def _prune():
+    """库超过 RETAIN_ITEMS 条时按时间保留最新的 RETAIN_KEEP 条，重写 items.jsonl，
+    并删掉已失效的 index.bin / keys.bin（随后重建）。Returns 是否裁剪。
+    """
+    try:
+        with open(_items_path(), "rb") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return False
+    if len(lines) <= RETAIN_ITEMS:
+        return False
+    start = len(_T_PREFIX)
+
+    def stamp(line):
+        return line[start:line.find(b'"', start)] if line.startswith(_T_PREFIX) else b""
+
+    kept = sorted(lines, key=stamp)[-RETAIN_KEEP:]
+    _common._atomic_write(_items_path(), b"".join(line + b"\n" for line in kept))
+    _common._remove_quietly(_index_path())
+    _common._remove_quietly(_keys_path())
+    return True
+
+
+def add(items):
+    """把一批快讯并入本地库，(t, title) 已存在的跳过。Returns 新增条数。
+
+    去重查 keys.bin 中的近期键，不必扫描整个库；只追加 items.jsonl。
+    未建索引的尾部达到 REINDEX_EVERY 条时在后台重建 index.bin（见 reindex），不占用本次查询。
+    """
+    if not items:
+        return 0
+    os.makedirs(store_dir(), exist_ok=True)
+    with _common.EntryLock(_index_path()):
+        known, state = _load_keys(min(n.get("t", "") for n in items))
+        fresh = []
+        for n in sorted(items, key=lambda n: n.get("t", "")):
+            key = (n.get("t", ""), n.get("title", ""))
+            if not key[1] or key in known:
+                continue
+            known.add(key)
+            fresh.append({"t": key[0], "cat": n.get("cat", ""), "title": key[1]})
+        if fresh:
+            blob = "".join(json.dumps(n, ensure_ascii=False) + "\n" for n in fresh).encode("utf-8")
+            with open(_items_path(), "ab") as f:
+                f.write(blob)
+            state["size"] += len(blob)
+            state["keys"].update((n["t"], n["title"]) for n in fresh if n["t"] >= state["floor"])
+        if fresh or state["dirty"]:
+            _save_keys(state)
+        pending = _pending()
+    if pending >= REINDEX_EVERY:
+        _common.spawn_task(_reindex_marker(), "_news_store", "reindex")
+    return len(fresh)
+
+
+def _pending():
+    """index.bin 之后还未建索引的行数。"""
+    size = _index_size()
+    try:
+        with open(_items_path(), "rb") as f:
+            f.seek(size)
+            return f.read().count(b"\n")
+    except OSError:
+        return 0
+
+
+def _reindex_marker():
+    return os.path.join(store_dir(), "reindex.running")
+
+
+def reindex():
+    """重写 index.bin（库超过 RETAIN_ITEMS 条时先裁剪），由 add() 通过 spawn_task 在后台调用。"""
+    try:
+        with _common.EntryLock(_index_path()):
+            if _pending() >= REINDEX_EVERY:
+                if _prune():
+                    _, state = _load_keys("")
+                    _save_keys(state)
+                _save_index(load())
+    except (OSError, ValueError):
+        pass
+    finally:
+        _common._remove_quietly(_reindex_marker())
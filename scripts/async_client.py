@@ -0,0 +1,122 @@
+"""asyncio 客户端 — 在自己的事件循环里直接取数，不必每次查询起一个 Python 子进程。
+
+    import asyncio, sys
+    sys.path.append(SKILL_DIR)      # 本文件所在的 scripts/ 目录；用 append，免得 calendar.py 遮蔽标准库
+    import async_client
+
+    async def main():
+        (snap, _), (margin, _), (news, _) = await asyncio.gather(
+            async_client.get_snapshot(),
+            async_client.get_margin(),
+            async_client.get_news(20),
+        )
+        print(async_client.load_script("fetch_snapshot").fmt_market(snap))
+        print(async_client.load_script("news").fmt_news(news, 20))
+
+每个协程 Returns (data, from_cache)，与 fetch_json 相同；data 的结构与对应脚本一致，
+可以直接交给脚本里的 fmt_* 格式化函数。失败时抛出 RuntimeError（404 为 NotFoundError）。
+
+取数沿用 _common 的全部缓存语义（TTL、条件请求、熔断、过期缓存先行返回），在专用线程池中执行，
+多个协程可 asyncio.gather 并发。首次调用时开启进程内内存缓存（同守护进程），同一数据集的并发请求只拉取一次。
+取消或 asyncio.wait_for 超时会立即让 await 返回；已发出的请求在线程里跑完并写入缓存，供下次使用。
+
+数据来源: https://hhxg.top
+"""
+from __future__ import annotations
+
+import asyncio
+import calendar  # noqa: F401  先占住标准库 calendar：各脚本导入时会把 scripts/ 插到 sys.path 最前
+import functools
+import os
+import sys
+import time
+
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import _common
+from _common import NotFoundError, fetch_json, load_script
+
+__all__ = [
+    "NotFoundError", "load_script", "get_snapshot", "get_margin", "get_news", "get_calendar", "close",
+]
+
+MAX_WORKERS = 8
+CALENDAR_KINDS = ("trading", "delivery", "earnings", "unlock")
+
+_EXECUTOR = None
+
+
+def _executor():
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        # 常驻在宿主进程里：与守护进程一样开启内存缓存，过期缓存也改由后台线程刷新
+        _common.MEMORY_CACHE = True
+        _EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="hhxg")
+    return _EXECUTOR
+
+
+async def _call(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _refresh(refresh):
+    # 不能沿用 fetch_json 的默认值：它会读宿主进程的 sys.argv 里是否有 --refresh
+    return bool(refresh) or _common.REFRESH
+
+
+async def get_snapshot(refresh=False):
+    """日报快照，可交给 fetch_snapshot 的 render_sections / fmt_* 格式化。"""
+    data, from_cache = await _call(fetch_json, "assistant/skill_snapshot.json", "last.json", _refresh(refresh))
+    _common.check_schema(data)
+    return data, from_cache
+
+
+async def get_margin(refresh=False):
+    """近 7 日融资融券，可交给 margin 的 fmt_overview / fmt_top / fmt_all。"""
+    return await _call(fetch_json, "assistant/recent_margin_7d.json", "margin_7d.json", _refresh(refresh))
+
+
+async def get_news(limit=20, refresh=False):
+    """最新 limit 条快讯（按时间倒序的列表），可交给 news 的 fmt_news(items, limit)。"""
+    data, from_cache = await _call(fetch_json, "news/n0.json", "news_latest.json", _refresh(refresh))
+    items = data if isinstance(data, list) else data.get("items", [])
+    return items[:limit] if limit else items, from_cache
+
+
+async def get_calendar(kind="trading", month=None, refresh=False):
+    """A 股日历。month 为 YYYY-MM，缺省为本月。
+
+    trading 返回该年的 calendar.TradingCalendar（不带懒加载器，查询不会在事件循环里阻塞联网），
+    可交给 fmt_trading；delivery 返回该年交割日事件，earnings / unlock 返回该月事件列表，
+    可交给 fmt_events(events, title)。
+    """
+    if kind not in CALENDAR_KINDS:
+        raise ValueError("kind 可选: %s" % ", ".join(CALENDAR_KINDS))
+    month = month or time.strftime("%Y-%m")
+    if len(month) != 7 or month[4] != "-" or not (month[:4] + month[5:]).isdigit():
+        raise ValueError("month 格式应为 YYYY-MM")
+    cal = load_script("calendar")
+    if kind == "trading":
+        request = cal._trading_days_request(month[:4])
+    elif kind == "delivery":
+        request = cal._events_request("delivery", month[:4])
+    else:
+        request = cal._events_request(kind, month)
+    data, from_cache = await _call(fetch_json, *request, refresh=_refresh(refresh))
+    if kind == "trading":
+        return cal.TradingCalendar.from_data(data), from_cache
+    events = data.get("events", []) if isinstance(data, dict) else []
+    return sorted(events, key=lambda e: e.get("date", "")), from_cache
+
+
+def close():
+    """关闭线程池和空闲 HTTP 连接。进行中的请求会跑完；之后再调用 get_* 会重新创建线程池。"""
+    global _EXECUTOR
+    executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+    if _common._POOL is not None:
+        _common._POOL.close()
@@ -6,23 +6,36 @@ Usage:
     python3 calendar.py trading 2026-03-05 # 某天是否交易日
     python3 calendar.py unlock 2026-03     # 某月解禁
     python3 calendar.py earnings 2026-02   # 某月业绩预告
-    python3 calendar.py delivery           # 全年交割日
+    python3 calendar.py delivery           # 今年交割日
+    python3 calendar.py delivery 2027      # 指定年份交割日
     python3 calendar.py week               # 本周事件汇总
+    python3 calendar.py offset 2026-03-05 +5             # 之后第 5 个交易日
+    python3 calendar.py offset 2026-03-05 -3             # 之前第 3 个交易日
+    python3 calendar.py count 2026-03-01 2026-03-31      # 区间内交易日数
+    python3 calendar.py range 2026-12-20 2027-01-10      # 区间交易日与事件（可跨年）
     python3 calendar.py --json             # JSON 原始输出
+    python3 calendar.py unlock 2026-03 --jsonl --fields date,label  # 每行一个事件，只保留指定字段
 
 数据来源: https://hhxg.top
 """
 from __future__ import annotations
 
-import json
 import os
 import sys
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from _common import fetch_json, print_cache_hint, run_main
+from _common import (
+    NotFoundError, fetch_json, fetch_many, print_cache_hint, run_main, delegate_to_daemon, output_options, write_json,
+)
 
-YEAR = datetime.now().strftime("%Y")
+MAX_RANGE_MONTHS = 24  # range 查询最多跨越的月数，避免一次拉取过多事件文件
+UNPUBLISHED = "%d 年交易日历尚未发布，无法判断交易日"
+
+
+def _this_year():
+    return datetime.now().strftime("%Y")
 
 
 def _this_week():
@@ -32,20 +45,238 @@ def _this_week():
     return monday.isoformat(), sunday.isoformat()
 
 
-def _fetch_trading_days():
-    data, cached = fetch_json(
-        "calendar/trading_days_%s.json" % YEAR, "trading_days.json"
-    )
-    return data, cached
+def _months(start, end):
+    """[start, end] 覆盖的月份列表（YYYY-MM）。"""
+    y, m = int(start[:4]), int(start[5:7])
+    months = []
+    while "%04d-%02d" % (y, m) <= end[:7]:
+        months.append("%04d-%02d" % (y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+def _trading_days_request(year=None):
+    """按年分区：每年一个缓存文件，互不覆盖。"""
+    year = year or _this_year()
+    return "calendar/trading_days_%s.json" % year, "trading_days_%s.json" % year
 
 
-def _fetch_events(kind, month):
-    """kind: delivery/earnings/unlock, month: 2026-03 或空。"""
+def _events_request(kind, period):
+    """kind: delivery/earnings/unlock。
+
+    period: delivery 为年份（如 2026，空则今年），其余为月份（如 2026-03）。Returns (path, cache_name)。
+    """
     if kind == "delivery":
-        path = "calendar/delivery_%s.json" % YEAR
+        period = period or _this_year()
+        path = "calendar/delivery_%s.json" % period
     else:
-        path = "calendar/%s_%s.json" % (kind, month.replace("-", ""))
-    return fetch_json(path, "%s_%s.json" % (kind, month or YEAR))
+        path = "calendar/%s_%s.json" % (kind, period.replace("-", ""))
+    return path, "%s_%s.json" % (kind, period)
+
+
+def _days_of(data):
+    return data if isinstance(data, list) else data.get("days", [])
+
+
+def _fetch_trading_days(year=None):
+    data, cached = fetch_json(*_trading_days_request(year))
+    return data, cached
+
+
+def _fetch_events(kind, period):
+    return fetch_json(*_events_request(kind, period))
+
+
+def _load_trading_year(year):
+    """TradingCalendar 的按需加载器：该年日历未发布或拉取失败时返回空列表。"""
+    try:
+        data, _ = _fetch_trading_days(str(year))
+    except RuntimeError:
+        return []
+    return _days_of(data)
+
+
+class TradingCalendar:
+    """交易日索引：set 判断是否交易日，有序数组 + bisect 求前后交易日、偏移和区间计数。
+
+    日期均为 YYYY-MM-DD 字符串（字典序即时间序）。传入 loader(year) 时按年懒加载：
+    查询落在未加载的年份、或结果越过已加载范围的边界时，才去拉取相邻年份。
+    已加载年份始终连续，保证 bisect 结果不会跳过中间某年。超出可用范围时返回 None。
+    """
+
+    def __init__(self, days, loader=None):
+        self._loader = loader
+        self._loaded = set()   # 已尝试加载的年份
+        self._present = set()  # 确有数据的年份
+        self._set_days(days)
+        for d in self.days:
+            self._loaded.add(int(d[:4]))
+        self._present = set(self._loaded)
+
+    @classmethod
+    def from_data(cls, data, loader=None):
+        return cls(_days_of(data), loader)
+
+    def _set_days(self, days):
+        self.days = sorted(set(days))
+        self._set = set(self.days)
+
+    def _load(self, year):
+        self._loaded.add(year)
+        days = self._loader(year)
+        if days:
+            self._present.add(year)
+            self._set_days(self.days + list(days))
+        return bool(days)
+
+    def _ensure(self, lo, hi=None):
+        """保证 [lo, hi] 年份（连同与已加载范围之间的空档）都已加载。"""
+        hi = lo if hi is None else hi
+        if self._loader is None or (lo in self._loaded and hi in self._loaded):
+            return
+        if self._loaded:
+            lo, hi = min(lo, min(self._loaded)), max(hi, max(self._loaded))
+        for year in range(lo, hi + 1):
+            if year not in self._loaded:
+                self._load(year)
+
+    def _extend(self, forward):
+        """向后（或向前）再加载一年，Returns 是否拿到了新数据。"""
+        if self._loader is None or not self._loaded:
+            return False
+        year = max(self._loaded) + 1 if forward else min(self._loaded) - 1
+        return self._load(year)
+
+    def has_year(self, year):
+        """该年交易日历是否可用（未发布的年份无法判断是否交易日）。"""
+        self._ensure(year)
+        return year in self._present
+
+    def is_trading(self, date):
+        self._ensure(int(date[:4]))
+        return date in self._set
+
+    def next(self, date):
+        """date 之后（不含）的第一个交易日。"""
+        self._ensure(int(date[:4]))
+        while True:
+            i = bisect_right(self.days, date)
+            if i < len(self.days):
+                return self.days[i]
+            if not self._extend(True):
+                return None
+
+    def prev(self, date):
+        """date 之前（不含）的最后一个交易日。"""
+        self._ensure(int(date[:4]))
+        while True:
+            i = bisect_left(self.days, date)
+            if i > 0:
+                return self.days[i - 1]
+            if not self._extend(False):
+                return None
+
+    def offset(self, date, n):
+        """date 起第 n 个交易日，n 可为负。
+
+        date 非交易日时 +1 即下一个交易日、-1 即上一个交易日；n=0 返回 date 当天或其后第一个交易日。
+        """
+        self._ensure(int(date[:4]))
+        while True:
+            if n > 0:
+                i = bisect_right(self.days, date) - 1 + n
+            elif n < 0:
+                i = bisect_left(self.days, date) + n
+            else:
+                i = bisect_left(self.days, date)
+            if 0 <= i < len(self.days):
+                return self.days[i]
+            # 越界方向上再加载一年，前向扩展会整体平移下标，重新计算
+            if not self._extend(i >= 0):
+                return None
+
+    def count(self, start, end):
+        """[start, end] 闭区间内的交易日数。"""
+        self._ensure(int(start[:4]), int(end[:4]))
+        return max(0, bisect_right(self.days, end) - bisect_left(self.days, start))
+
+    def between(self, start, end):
+        """[start, end] 闭区间内的交易日列表。"""
+        self._ensure(int(start[:4]), int(end[:4]))
+        return self.days[bisect_left(self.days, start):bisect_right(self.days, end)]
+
+
+def _calendar(year=None):
+    """当年交易日历（相邻年份按需懒加载）。Returns (TradingCalendar, from_cache)。"""
+    data, cached = _fetch_trading_days(year)
+    return TradingCalendar.from_data(data, _load_trading_year), cached
+
+
+def _calendar_or_exit(year):
+    """main 用：拉取失败时打印原因并退出，年份未发布时不显示 404 的升级提示。"""
+    try:
+        return _calendar(year)
+    except NotFoundError:
+        print(UNPUBLISHED % int(year), file=sys.stderr)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+    sys.exit(1)
+
+
+def _unpublished(cal, start, end=None):
+    """[start, end] 涉及年份中第一个交易日历未发布的年份，全部可用时返回 None。"""
+    lo, hi = sorted((start[:4], (end or start)[:4]))
+    for year in range(int(lo), int(hi) + 1):
+        if not cal.has_year(year):
+            return year
+    return None
+
+
+def _collect(start, end, clip=True):
+    """并发拉取 [start, end] 涉及年份的交易日历与交割日、涉及月份的解禁/业绩预告。
+
+    Returns (TradingCalendar, 事件列表, from_cache)。clip=True 时只保留区间内事件并按日期排序，
+    否则按文件原样返回这些月份/年份的全部事件（week --json 的原有输出）。
+    交易日历拉取失败时抛出 RuntimeError。
+    """
+    years = [str(y) for y in range(int(start[:4]), int(end[:4]) + 1)]
+    td_reqs = [_trading_days_request(y) for y in years]
+    event_reqs = [_events_request(kind, month) for month in _months(start, end) for kind in ("unlock", "earnings")]
+    # delivery 按年拉取，每年只拉一次
+    event_reqs += [_events_request("delivery", y) for y in years]
+    results = fetch_many(td_reqs + event_reqs)
+
+    days = []
+    cached = False
+    for i, (path, _) in enumerate(td_reqs):
+        result = results[path]
+        if isinstance(result, RuntimeError):
+            # 起始年必须可用；后续年份可能尚未发布
+            if i == 0:
+                raise result
+            continue
+        days.extend(_days_of(result[0]))
+        cached = cached or result[1]
+    events = []
+    for path, _ in event_reqs:
+        result = results[path]
+        if isinstance(result, RuntimeError):
+            continue
+        edata, _ = result
+        evts = edata.get("events", []) if isinstance(edata, dict) else []
+        events.extend(e for e in evts if not clip or start <= e.get("date", "") <= end)
+    if clip:
+        events.sort(key=lambda x: x.get("date", ""))
+    return TradingCalendar(days, _load_trading_year), events, cached
+
+
+def _valid_date(s):
+    # 不用 strptime：它依赖标准库 calendar，而本脚本同名会遮蔽它
+    try:
+        datetime.fromisoformat(s)
+    except ValueError:
+        return False
+    return len(s) == 10
 
 
 # ── Formatters ──────────────────────────────────────────────
@@ -58,16 +289,15 @@ def fmt_trading(data, args):
         target = today
     else:
         target = args[0]
-    days = data if isinstance(data, list) else data.get("days", data)
-    is_trading = target in days
-    if is_trading:
+    cal = data if isinstance(data, TradingCalendar) else TradingCalendar.from_data(data)
+    # 未加载到该年日历时 is_trading 恒为 False，会把交易日误报成休市
+    missing = _unpublished(cal, target)
+    if missing:
+        return UNPUBLISHED % missing
+    if cal.is_trading(target):
         return "%s 是交易日" % target
     # 找下一个交易日
-    nxt = ""
-    for d in sorted(days):
-        if d > target:
-            nxt = d
-            break
+    nxt = cal.next(target) or ""
     hint = "，下一个交易日是 %s" % nxt if nxt else ""
     return "%s 不是交易日（休市）%s" % (target, hint)
 
@@ -97,14 +327,55 @@ def fmt_events(events, title):
     return "\n".join(lines)
 
 
+def fmt_offset(cal, date, n):
+    missing = _unpublished(cal, date)
+    if missing:
+        return UNPUBLISHED % missing
+    result = cal.offset(date, n)
+    direction = "之后" if n >= 0 else "之前"
+    if result is None:
+        return "%s %s第 %d 个交易日超出已发布的交易日历范围" % (date, direction, abs(n))
+    if n == 0:
+        return "%s 起第一个交易日是 %s" % (date, result)
+    return "%s %s第 %d 个交易日是 %s" % (date, direction, abs(n), result)
+
+
+def fmt_count(cal, start, end):
+    missing = _unpublished(cal, start, end)
+    if missing:
+        return UNPUBLISHED % missing
+    return "%s ~ %s 共 %d 个交易日" % (start, end, cal.count(start, end))
+
+
+def fmt_range(cal, events, start, end):
+    """任意区间（可跨年）的交易日与事件汇总。"""
+    days = cal.between(start, end)
+    lines = [
+        "# A 股日历（%s ~ %s）" % (start, end),
+        "",
+        "交易日 %d 天%s" % (len(days), "（%s ~ %s）" % (days[0], days[-1]) if days else ""),
+        "",
+    ]
+    if events:
+        lines.append("## 区间事件")
+        for e in events:
+            lines.append(
+                "- **%s** [%s] %s" % (e.get("date", ""), e.get("type", ""), e.get("label", ""))
+            )
+    else:
+        lines.append("区间内无重大日历事件")
+    return "\n".join(lines)
+
+
 def fmt_week(trading_days, all_events):
     """本周事件汇总。"""
     mon, sun = _this_week()
     today = datetime.now().strftime("%Y-%m-%d")
 
     # 本周交易日
-    week_td = [d for d in trading_days if mon <= d <= sun]
-    is_today_trading = today in trading_days
+    cal = trading_days if isinstance(trading_days, TradingCalendar) else TradingCalendar(trading_days)
+    week_td = cal.between(mon, sun)
+    is_today_trading = cal.is_trading(today)
     lines = [
         "# 本周 A 股日历（%s ~ %s）" % (mon, sun),
         "",
@@ -142,67 +413,119 @@ SECTIONS = {
     "unlock": "unlock",
     "earnings": "earnings",
     "delivery": "delivery",
+    "offset": "offset",
+    "count": "count",
+    "range": "range",
 }
 
 
+def _exit_if_unpublished(cal, start, end=None):
+    missing = _unpublished(cal, start, end)
+    if missing:
+        print(UNPUBLISHED % missing, file=sys.stderr)
+        sys.exit(1)
+
+
+def _usage_exit(msg):
+    print(msg)
+    sys.exit(1)
+
+
 def main():
+    delegate_to_daemon("calendar")
     section, extra_args, use_json = run_main(SECTIONS, default="week")
+    fields, use_jsonl = output_options()
 
     if section == "trading":
-        data, cached = _fetch_trading_days()
-        print_cache_hint(cached, YEAR)
+        target = extra_args[0] if extra_args else datetime.now().strftime("%Y-%m-%d")
+        if not _valid_date(target):
+            _usage_exit("日期格式应为 YYYY-MM-DD: %s" % target)
+        cal, cached = _calendar_or_exit(target[:4])
+        print_cache_hint(cached, target[:4])
+        if use_json:
+            days = cal.between(target[:4] + "-01-01", target[:4] + "-12-31")
+            write_json(days, ({"date": d} for d in days), fields, use_jsonl)
+        else:
+            print(fmt_trading(cal, [target]))
+
+    elif section in ("offset", "count"):
+        if len(extra_args) < 2 or not _valid_date(extra_args[0]):
+            _usage_exit("用法: calendar.py offset YYYY-MM-DD +N | calendar.py count YYYY-MM-DD YYYY-MM-DD")
+        start = extra_args[0]
+        cal, cached = _calendar_or_exit(start[:4])
+        print_cache_hint(cached, start[:4])
+        if section == "offset":
+            try:
+                n = int(extra_args[1])
+            except ValueError:
+                _usage_exit("偏移量必须是整数: %s" % extra_args[1])
+            _exit_if_unpublished(cal, start)
+            if use_json:
+                write_json({"date": start, "offset": n, "result": cal.offset(start, n)}, None, fields, use_jsonl)
+            else:
+                print(fmt_offset(cal, start, n))
+        else:
+            end = extra_args[1]
+            if not _valid_date(end):
+                _usage_exit("日期格式应为 YYYY-MM-DD: %s" % end)
+            _exit_if_unpublished(cal, start, end)
+            if use_json:
+                write_json({"start": start, "end": end, "count": cal.count(start, end)}, None, fields, use_jsonl)
+            else:
+                print(fmt_count(cal, start, end))
+
+    elif section == "range":
+        if len(extra_args) < 2 or not all(_valid_date(a) for a in extra_args[:2]):
+            _usage_exit("用法: calendar.py range YYYY-MM-DD YYYY-MM-DD")
+        start, end = sorted(extra_args[:2])
+        if len(_months(start, end)) > MAX_RANGE_MONTHS:
+            _usage_exit("区间最长 %d 个月" % MAX_RANGE_MONTHS)
+        try:
+            cal, events, cached = _collect(start, end)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+        print_cache_hint(cached, "%s ~ %s" % (start, end))
         if use_json:
-            print(json.dumps(data, ensure_ascii=False, indent=2))
+            payload = {"start": start, "end": end, "trading_days": cal.between(start, end), "events": events}
+            write_json(payload, events, fields, use_jsonl)
         else:
-            print(fmt_trading(data, extra_args))
+            print(fmt_range(cal, events, start, end))
 
     elif section in ("unlock", "earnings"):
         month = extra_args[0] if extra_args else datetime.now().strftime("%Y-%m")
         data, cached = _fetch_events(section, month)
         print_cache_hint(cached, month)
+        events = data.get("events", []) if isinstance(data, dict) else data
         if use_json:
-            print(json.dumps(data, ensure_ascii=False, indent=2))
+            write_json(data, events, fields, use_jsonl)
         else:
-            events = data.get("events", []) if isinstance(data, dict) else data
             title = "限售解禁 — %s" % month if section == "unlock" else "业绩预告 — %s" % month
             print(fmt_events(events, title))
 
     elif section == "delivery":
-        data, cached = _fetch_events("delivery", "")
-        print_cache_hint(cached, YEAR)
+        year = extra_args[0] if extra_args else _this_year()
+        data, cached = _fetch_events("delivery", year)
+        print_cache_hint(cached, year)
+        events = data.get("events", []) if isinstance(data, dict) else data
         if use_json:
-            print(json.dumps(data, ensure_ascii=False, indent=2))
+            write_json(data, events, fields, use_jsonl)
         else:
-            events = data.get("events", []) if isinstance(data, dict) else data
-            print(fmt_events(events, "期货/期权交割日 — %s" % YEAR))
+            print(fmt_events(events, "期货/期权交割日 — %s" % year))
 
     elif section == "week":
-        td_data, cached1 = _fetch_trading_days()
-        trading_days = td_data if isinstance(td_data, list) else []
-        # 收集本周涉及月份的事件（处理跨月边界）
+        # 本周可能跨月甚至跨年，涉及的交易日历/事件文件一次并发拉取
         mon, sun = _this_week()
-        months = {mon[:7], sun[:7]}  # 可能跨两个月
-        all_events = []
-        for month in sorted(months):
-            for kind in ("unlock", "earnings"):
-                try:
-                    edata, _ = _fetch_events(kind, month)
-                    evts = edata.get("events", []) if isinstance(edata, dict) else []
-                    all_events.extend(evts)
-                except RuntimeError:
-                    pass
-        # delivery 按年拉取，只拉一次避免重复
         try:
-            edata, _ = _fetch_events("delivery", "")
-            evts = edata.get("events", []) if isinstance(edata, dict) else []
-            all_events.extend(evts)
-        except RuntimeError:
-            pass
-        print_cache_hint(cached1, mon[:7])
+            cal, events, cached = _collect(mon, sun, clip=False)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+        print_cache_hint(cached, mon[:7])
         if use_json:
-            print(json.dumps({"trading_days": trading_days, "events": all_events}, ensure_ascii=False, indent=2))
+            write_json({"trading_days": cal.days, "events": events}, events, fields, use_jsonl)
         else:
-            print(fmt_week(trading_days, all_events))
+            print(fmt_week(cal, events))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""常驻守护进程 — 数据常驻内存，通过本地 Unix socket 响应各脚本的查询。
+
+Usage:
+    python3 daemon.py start    # 后台启动
+    python3 daemon.py stop     # 停止
+    python3 daemon.py status   # 查看运行状态及内存中的数据集
+    python3 daemon.py serve    # 前台运行（调试用）
+
+启动后 fetch_snapshot.py / margin.py / calendar.py / news.py 会自动把查询转交给
+守护进程，用内存中已解析的数据和原有格式化函数输出；守护进程未运行时各脚本照常直连。
+数据按缓存 TTL（盘后发布时间 / 快讯 60 秒）在后台自动刷新。
+
+数据来源: https://hhxg.top
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import _common
+from _common import daemon_socket, load_script
+
+SCRIPTS = ("fetch_snapshot", "margin", "calendar", "news")
+REFRESH_TICK = 30           # 后台每 30 秒检查一次过期数据集
+START_TIMEOUT = 10
+
+
+# ── Server ──────────────────────────────────────────────────
+
+
+class _ThreadStream(io.TextIOBase):
+    """按线程分流的 sys.stdout / sys.stderr。
+
+    serve() 启动时装上一次：_run_script 所在线程的输出写进本次请求的缓冲，
+    其余线程（后台刷新）照旧写原始流，不会串进某个客户端的回复里。
+    不像 redirect_stdout 那样在每次请求时替换进程全局的 sys.stdout。
+    """
+
+    def __init__(self, default):
+        super().__init__()
+        self._default = default
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, "buffer", None) or self._default
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def flush(self):
+        self._target().flush()
+
+
+def _install_streams():
+    if not isinstance(sys.stdout, _ThreadStream):
+        sys.stdout = _ThreadStream(sys.stdout)
+    if not isinstance(sys.stderr, _ThreadStream):
+        sys.stderr = _ThreadStream(sys.stderr)
+
+
+def _run_script(name, argv):
+    """在本进程内执行脚本 main()，捕获输出。Returns {stdout, stderr, code}。"""
+    module = load_script(name)
+    out, err = io.StringIO(), io.StringIO()
+    saved_argv = sys.argv
+    sys.argv = ["%s.py" % name] + list(argv)
+    code = 0
+    _install_streams()
+    sys.stdout.capture(out)
+    sys.stderr.capture(err)
+    try:
+        module.main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if isinstance(e.code, str):
+            err.write(e.code + "\n")
+    except Exception as e:  # 单次查询出错不能拖垮守护进程
+        err.write("守护进程执行出错: %s\n" % e)
+        code = 1
+    finally:
+        sys.stdout.release()
+        sys.stderr.release()
+        sys.argv = saved_argv
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "code": code}
+
+
+def _status():
+    now = time.time()
+    datasets = {
+        path: {"expires_in": round(entry["expires_at"] - now)}
+        for path, entry in _common._MEMORY.items()
+    }
+    return {"pid": os.getpid(), "datasets": datasets}
+
+
+def _handle(conn, stop_event):
+    chunks = []
+    while not chunks or not chunks[-1].endswith(b"\n"):
+        chunk = conn.recv(_common.CHUNK_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    try:
+        request = json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError:
+        return
+    if not isinstance(request, dict):
+        reply = {"stdout": "", "stderr": "请求格式错误\n", "code": 2}
+        conn.sendall(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+        return
+    cmd = request.get("cmd")
+    if cmd == "stop":
+        stop_event.set()
+        reply = {"stopped": True}
+    elif cmd == "status":
+        reply = _status()
+    elif request.get("script") in SCRIPTS and isinstance(request.get("argv", []), list):
+        reply = _run_script(request["script"], [str(a) for a in request.get("argv", [])])
+    else:
+        reply = {"stdout": "", "stderr": "未知请求\n", "code": 2}
+    conn.sendall(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+
+
+def _refresh_loop(stop_event):
+    """先预加载常用数据，再按缓存 TTL 后台刷新已加载的数据集，让前台查询始终命中内存。"""
+    _warm_up()
+    while not stop_event.wait(REFRESH_TICK):
+        now = time.time()
+        for path, entry in list(_common._MEMORY.items()):
+            if entry["expires_at"] > now:
+                continue
+            try:
+                _common.fetch_json(path, entry["cache_name"])
+            except RuntimeError:
+                pass
+
+
+def _warm_up():
+    """启动时预加载日报、融资融券、快讯。"""
+    for name, fetch in (("fetch_snapshot", "fetch"), ("margin", "_fetch"), ("news", "_fetch")):
+        try:
+            getattr(load_script(name), fetch)()
+        except RuntimeError:
+            pass
+
+
+def serve():
+    if not hasattr(socket, "AF_UNIX"):
+        print("当前系统不支持 Unix socket，无法启动守护进程", file=sys.stderr)
+        sys.exit(1)
+    path = daemon_socket()
+    if _request({"cmd": "status"}) is not None:
+        print("守护进程已在运行", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.unlink(path)  # 上次异常退出遗留的 socket 文件
+
+    _common.IN_DAEMON = True
+    _common.MEMORY_CACHE = True
+    _install_streams()  # 在后台刷新线程启动前装好，之后不再替换 sys.stdout / sys.stderr
+
+    stop_event = threading.Event()
+    threading.Thread(target=_refresh_loop, args=(stop_event,), daemon=True).start()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+    server.settimeout(1)
+    try:
+        # 逐个处理请求：脚本 main() 会改写 sys.argv，不能并发
+        while not stop_event.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            with conn:
+                conn.settimeout(_common.DAEMON_TIMEOUT)
+                try:
+                    _handle(conn, stop_event)
+                except Exception:  # 单个客户端的坏请求不能让守护进程退出
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+# ── Control ─────────────────────────────────────────────────
+
+
+def _request(payload):
+    """向守护进程发送控制命令，未运行时返回 None。"""
+    path = daemon_socket()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(path)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            data = b""
+            while True:
+                chunk = sock.recv(_common.CHUNK_SIZE)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data.decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def start():
+    if _request({"cmd": "status"}) is not None:
+        print("守护进程已在运行")
+        return
+    os.makedirs(_common.CACHE_DIR, exist_ok=True)
+    log = open(os.path.join(_common.CACHE_DIR, "daemon.log"), "ab")
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve"],
+        stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+        start_new_session=True,
+    )
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        status = _request({"cmd": "status"})
+        if status is not None:
+            print("守护进程已启动 (pid %s)" % status["pid"])
+            return
+        time.sleep(0.1)
+    print("守护进程启动超时，详见 %s" % log.name, file=sys.stderr)
+    sys.exit(1)
+
+
+def stop():
+    if _request({"cmd": "stop"}) is None:
+        print("守护进程未运行")
+    else:
+        print("守护进程已停止")
+
+
+def status():
+    st = _request({"cmd": "status"})
+    if st is None:
+        print("守护进程未运行")
+        return
+    print("守护进程运行中 (pid %s)" % st["pid"])
+    for path, info in sorted(st["datasets"].items()):
+        print("- %s（%s 秒后刷新）" % (path, max(info["expires_in"], 0)))
+
+
+COMMANDS = {"start": start, "stop": stop, "status": status, "serve": serve}
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("-")]
+    cmd = args[0] if args else "status"
+    if cmd not in COMMANDS:
+        print("未知命令: %s" % cmd)
+        print("可选: %s" % ", ".join(COMMANDS))
+        sys.exit(1)
+    COMMANDS[cmd]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""本地 HTTP 网关 — 按 openapi.yaml 提供 /api/snapshot、/api/margin、/api/news、/api/calendar。
+
+Usage:
+    python3 gateway.py                 # 监听 127.0.0.1:8787
+    python3 gateway.py 9000            # 指定端口
+    python3 gateway.py --host=0.0.0.0  # 对局域网开放
+
+GPT Actions / Dify / Coze 或内部机器人把 API 地址指向本网关即可。所有请求共用
+同一份内存 + 磁盘缓存，并发请求同一数据集时只向上游拉取一次。
+
+数据来源: https://hhxg.top
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import _common
+from _common import NotFoundError, load_script
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+NEWS_LIMIT_DEFAULT = 20
+NEWS_LIMIT_MAX = 50
+CALENDAR_TYPES = ("trading", "delivery", "earnings", "unlock")
+MONTH_RE = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ── Operations ──────────────────────────────────────────────
+
+
+def get_snapshot(query):
+    data, _ = load_script("fetch_snapshot").fetch()
+    return {"success": True, "data": data}
+
+
+def get_margin(query):
+    data, _ = load_script("margin")._fetch()
+    days = []
+    for t in data.get("market", {}).get("daily_totals", []):
+        rz = t.get("rzye_yi", 0)
+        rq = t.get("rqye_yi", 0)
+        days.append({
+            "date": t.get("date", ""),
+            "margin_long": rz,
+            "margin_short": rq,
+            "total": round(rz + rq, 2),
+        })
+    return {
+        "success": True,
+        "data": {"days": days, "window": data.get("window", {}), "top": data.get("top", {})},
+    }
+
+
+def get_news(query):
+    raw = query.get("limit", [str(NEWS_LIMIT_DEFAULT)])[0]
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ApiError(400, "limit 必须是整数")
+    if not 1 <= limit <= NEWS_LIMIT_MAX:
+        raise ApiError(400, "limit 范围为 1-%d" % NEWS_LIMIT_MAX)
+    data, _ = load_script("news")._fetch()
+    items = data if isinstance(data, list) else data.get("items", [])
+    out = [
+        {"title": n.get("title", ""), "time": n.get("t", ""), "category": n.get("cat", "")}
+        for n in items[:limit]
+    ]
+    return {"success": True, "data": {"items": out, "total": len(out)}}
+
+
+def get_calendar(query):
+    kind = query.get("type", ["trading"])[0]
+    if kind not in CALENDAR_TYPES:
+        raise ApiError(400, "type 可选: %s" % ", ".join(CALENDAR_TYPES))
+    month = query.get("month", [datetime.now().strftime("%Y-%m")])[0]
+    if not MONTH_RE.fullmatch(month):
+        raise ApiError(400, "month 格式应为 YYYY-MM")
+
+    cal = load_script("calendar")
+    try:
+        if kind == "trading":
+            days, _ = cal._fetch_trading_days(month[:4])
+            data = {"days": cal._days_of(days)}
+        elif kind == "delivery":
+            data, _ = cal._fetch_events("delivery", month[:4])
+        else:
+            data, _ = cal._fetch_events(kind, month)
+    except NotFoundError:
+        raise ApiError(404, "%s 数据暂未生成" % (month if kind in ("earnings", "unlock") else month[:4]))
+    resp = {"success": True, "type": kind, "data": data}
+    if kind in ("earnings", "unlock"):
+        resp["month"] = month
+    return resp
+
+
+ROUTES = {
+    "/api/snapshot": get_snapshot,
+    "/api/margin": get_margin,
+    "/api/news": get_news,
+    "/api/calendar": get_calendar,
+}
+
+
+# ── Server ──────────────────────────────────────────────────
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    server_version = "hhxg-gateway/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        op = ROUTES.get(url.path.rstrip("/") or "/")
+        if op is None:
+            self._send(404, {"success": False, "error": "接口不存在"})
+            return
+        try:
+            body = op(parse_qs(url.query))
+        except ApiError as e:
+            self._send(e.status, {"success": False, "error": str(e)})
+        except RuntimeError as e:
+            self._send(502, {"success": False, "error": str(e)})
+        except Exception:
+            self._send(500, {"success": False, "error": "服务异常"})
+        else:
+            self._send(200, body, self._max_age(url.path))
+
+    def _max_age(self, path):
+        """按共享缓存中同类数据集（快讯 / 盘后数据）最早的过期时间给出 Cache-Control。"""
+        now = time.time()
+        is_news = path == "/api/news"
+        ages = [
+            e["expires_at"] - now
+            for p, e in list(_common._MEMORY.items())
+            if p.startswith("news/") == is_news
+        ]
+        return max(0, int(min(ages))) if ages else 0
+
+    def _send(self, status, payload, max_age=0):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=%d" % max_age if max_age else "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        if _common.DEBUG:
+            super().log_message(fmt, *args)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    _common.IN_DAEMON = True
+    _common.MEMORY_CACHE = True
+    server = ThreadingHTTPServer((host, port), GatewayHandler)
+    server.daemon_threads = True
+    print("hhxg 网关已启动: http://%s:%d/api/snapshot" % (host, port), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("-")]
+    flags = [a for a in sys.argv[1:] if a.startswith("-")]
+    host = DEFAULT_HOST
+    for flag in flags:
+        if flag.startswith("--host="):
+            host = flag.split("=", 1)[1]
+    port = DEFAULT_PORT
+    if args:
+        try:
+            port = int(args[0])
+        except ValueError:
+            print("端口必须是整数: %s" % args[0])
+            sys.exit(1)
+    serve(host, port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""历史数据查询 — 从本地归档按日期区间取日报 / 两融字段，无需联网。
+
+每次下载到新的日报快照或两融数据时自动按数据日期归档（HHXG_ARCHIVE=0 关闭）。
+
+Usage:
+    python3 history.py                                          # 归档概览
+    python3 history.py snapshot market.sentiment_index market.limit_up --days=60
+    python3 history.py margin market.delta_rzye_yi --since=2026-01-01 --until=2026-03-31
+    python3 history.py snapshot market.limit_up --json          # JSON 输出
+    python3 history.py compact                                  # 压缩往月分区
+    python3 history.py export [seats ...] [--force]             # 导出列式文件（逐股明细，供分析）
+    python3 history.py group seats --by=seat --sum=net_yi --days=90   # 按席位汇总近 90 天净买入
+    python3 history.py group ladder --by=industry --days=20 --top=10  # 按行业统计涨停家次
+
+数据来源: https://hhxg.top
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import _archive
+import _columnar
+from _common import parse_argv
+
+VALUE_OPTIONS = ("--days", "--since", "--until", "--by", "--sum", "--top")  # 支持 --days 60 与 --days=60
+DEFAULT_FIELDS = {
+    "snapshot": ["market.sentiment_index", "market.limit_up", "market.fried", "ladder.max_streak"],
+    "margin": ["market.delta_rzye_yi", "market.delta_rqye_yi"],
+}
+
+
+def fmt_overview():
+    lines = ["# 本地历史归档", ""]
+    for dataset in _archive.KEY_FIELDS:
+        ks = _archive.keys(dataset)
+        if ks:
+            lines.append("- %s: %d 天（%s ~ %s）" % (dataset, len(ks), ks[0], ks[-1]))
+        else:
+            lines.append("- %s: 暂无归档" % dataset)
+    return "\n".join(lines)
+
+
+def fmt_rows(dataset, fields, rows):
+    if not rows:
+        return "暂无 %s 归档数据" % dataset
+    lines = [
+        "# %s 历史（%d 天）" % (dataset, len(rows)),
+        "",
+        "| 日期 | %s |" % " | ".join(fields),
+        "|------|" + "------|" * len(fields),
+    ]
+    for date, values in rows:
+        cells = ["-" if values[f] is None else str(values[f]) for f in fields]
+        lines.append("| %s | %s |" % (date, " | ".join(cells)))
+    return "\n".join(lines)
+
+
+def fmt_groups(table, by, value, groups, span):
+    if not groups:
+        return "暂无 %s 列式数据" % table
+    total = "%s 合计" % value if value else None
+    lines = [
+        "# %s 按 %s 汇总（%s）" % (table, by, span),
+        "",
+        "| %s | 行数 |%s" % (by, " %s |" % total if total else ""),
+        "|------|------|%s" % ("------|" if total else ""),
+    ]
+    for key, count, amount in groups:
+        lines.append("| %s | %d |%s" % (key or "-", count, " %.2f |" % amount if total else ""))
+    return "\n".join(lines)
+
+
+def group(args, options, use_json):
+    """group <table> --by=列 [--sum=列] [--days=N | --since= --until=] [--top=N]"""
+    by, value = options.get("--by"), options.get("--sum")
+    if len(args) != 1 or args[0] not in _columnar.SCHEMAS or not by:
+        print("用法: history.py group <%s> --by=列 [--sum=列] [--days=N]" % "|".join(_columnar.SCHEMAS))
+        sys.exit(1)
+    try:
+        last = int(options.get("--days") or 0) or None
+        top = int(options.get("--top") or 20)
+    except ValueError:
+        print("--days / --top 必须是整数")
+        sys.exit(1)
+    since, until = options.get("--since"), options.get("--until")
+    try:
+        with _columnar.open_table(args[0]) as table:
+            groups = _columnar.group_by(table, by, value, since=since, until=until, last=last)[:top]
+            lo, hi = table.date_slice(since, until, last)
+            span = "%s ~ %s，%d 天" % (table.dates[lo], table.dates[hi - 1], hi - lo) if hi else "无数据"
+    except (KeyError, ValueError, RuntimeError) as e:
+        print(e.args[0] if e.args else str(e))
+        sys.exit(1)
+    if use_json:
+        rows = []
+        for key, count, amount in groups:
+            row = {by: key, "rows": count}
+            if value:
+                row[value] = round(amount, 4)
+            rows.append(row)
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print(fmt_groups(args[0], by, value, groups, span))
+
+
+def main():
+    args, flags, options = parse_argv(value_options=VALUE_OPTIONS)
+    use_json = "--json" in flags
+
+    if not args:
+        print(fmt_overview())
+        return
+    if args[0] == "compact":
+        n = sum(_archive.compact(ds) for ds in _archive.KEY_FIELDS)
+        print("已压缩 %d 个分区" % n)
+        return
+    if args[0] == "export":
+        try:
+            written = _columnar.export(args[1:] or None, force="--force" in flags)
+        except ValueError as e:
+            print(str(e))
+            sys.exit(1)
+        for table, rows in written.items():
+            print("- %s: %d 行" % (table, rows))
+        print("列式文件已更新: %s" % _columnar.columnar_dir() if written else "列式文件已是最新")
+        return
+    if args[0] == "group":
+        group(args[1:], options, use_json)
+        return
+
+    dataset = args[0]
+    if dataset not in _archive.KEY_FIELDS:
+        print("未知数据集: %s" % dataset)
+        print("可选: %s" % ", ".join(_archive.KEY_FIELDS))
+        sys.exit(1)
+    fields = args[1:] or DEFAULT_FIELDS[dataset]
+    days = options.get("--days")
+    try:
+        last = int(days) if days else None
+    except ValueError:
+        print("--days 必须是整数: %s" % days)
+        sys.exit(1)
+
+    rows = _archive.query(
+        dataset, fields,
+        since=options.get("--since"), until=options.get("--until"), last=last,
+    )
+    if use_json:
+        print(json.dumps([dict(v, date=d) for d, v in rows], ensure_ascii=False, indent=2))
+    else:
+        print(fmt_rows(dataset, fields, rows))
+
+
+if __name__ == "__main__":
+    main()
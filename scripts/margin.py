@@ -6,17 +6,18 @@ Usage:
     python3 margin.py overview  # 市场总览
     python3 margin.py top       # 净买入/净卖出 TOP
     python3 margin.py --json    # JSON 原始输出
+    python3 margin.py top --jsonl                   # 每行一只个股
+    python3 margin.py --json --fields market.delta_rzye_yi  # 只输出指定字段
 
 数据来源: https://hhxg.top
 """
 from __future__ import annotations
 
-import json
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from _common import fetch_json, print_cache_hint, run_main
+from _common import fetch_json, print_cache_hint, run_main, delegate_to_daemon, output_options, write_json
 
 
 def _fetch():
@@ -107,7 +108,22 @@ def fmt_all(data):
 SECTIONS = {"all": fmt_all, "overview": fmt_overview, "top": fmt_top}
 
 
+def _top_records(data):
+    top = data.get("top", {})
+    for side in ("increase_rzye", "decrease_rzye"):
+        for item in top.get(side, []):
+            yield dict(item, side=side)
+
+
+# --jsonl 下各板块逐行输出的记录；all 整份数据作为一条记录
+RECORDS = {
+    "overview": lambda data: data.get("market", {}).get("daily_totals", []),
+    "top": _top_records,
+}
+
+
 def main():
+    delegate_to_daemon("margin")
     section, _, use_json = run_main(SECTIONS)
     try:
         data, cached = _fetch()
@@ -116,7 +132,9 @@ def main():
         sys.exit(1)
     print_cache_hint(cached, data.get("window", {}).get("end", ""))
     if use_json:
-        print(json.dumps(data, ensure_ascii=False, indent=2))
+        fields, use_jsonl = output_options()
+        records = RECORDS[section](data) if section in RECORDS else None
+        write_json(data, records, fields, use_jsonl)
     else:
         print(SECTIONS[section](data))
 
@@ -5,21 +5,130 @@ Usage:
     python3 news.py            # 最新 20 条
     python3 news.py 50         # 最新 50 条
     python3 news.py --json     # JSON 原始输出
+    python3 news.py 50 --jsonl --fields t,title  # 每行一条，只保留指定字段
+    python3 news.py --follow           # 持续跟踪，只输出新快讯（Ctrl-C 退出）
+    python3 news.py --follow --jsonl   # 同上，每行一条 JSON，便于管道消费
+    python3 news.py --follow --once    # 只输出上次以来的新快讯后退出
+    python3 news.py --follow --interval=10  # 最短轮询间隔（秒），默认 5
+    python3 news.py search 半导体              # 检索本地快讯库（不联网）
+    python3 news.py search 降准 --cat 宏观 --since 2026-03-01
 
 数据来源: https://hhxg.top
 """
 from __future__ import annotations
 
-import json
 import os
 import sys
+import time
+from collections import deque
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from _common import fetch_json, print_cache_hint
+import _common
+from _common import (
+    VALUE_OPTIONS, fetch_json, print_cache_hint, delegate_to_daemon, parse_argv, output_options, write_json,
+)
 
+FOLLOW_MIN = 5      # 自适应轮询：有新快讯时回到最短间隔（秒）
+FOLLOW_MAX = 60     # 连续无新快讯时逐步放宽到的最长间隔（秒）
+FOLLOW_BACKOFF = 1.5
+FOLLOW_SEEN = 1000  # 去重记忆的最近标题数
+FOLLOW_STATE = "news_follow.json"
 
-def _fetch():
-    return fetch_json("news/n0.json", "news_latest.json")
+
+def _fetch(refresh=None):
+    return fetch_json("news/n0.json", "news_latest.json", refresh=refresh)
+
+
+def _items(data):
+    return data if isinstance(data, list) else data.get("items", [])
+
+
+def _norm_title(title):
+    # 转载/重发的快讯常只差空白，归一化后再比较
+    return "".join(title.split())
+
+
+class Watermark:
+    """已读位置：最后一条快讯的 (t, title) 加最近标题集合，落盘在缓存目录下。"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(_common.CACHE_DIR, FOLLOW_STATE)
+        state = _common._load_cache(self.path) or {}
+        self.t = state.get("t", "")
+        self.title = state.get("title", "")
+        self.seen = deque(state.get("seen", []), maxlen=FOLLOW_SEEN)
+        self._seen_set = set(self.seen)
+
+    def __bool__(self):
+        return bool(self.t)
+
+    def delta(self, items):
+        """items 为新到旧排列，返回水位之后的新快讯（旧到新），跳过重发的同标题快讯。
+
+        遇到早于水位的条目即停止扫描，开销只与新增条数有关。
+        """
+        candidates = []
+        for n in items:
+            t = n.get("t", "")
+            if self.t and t < self.t:
+                break
+            candidates.append(n)
+        fresh, keys = [], set()
+        # 同一批内重发的标题只保留最早的一条
+        for n in reversed(candidates):
+            key = _norm_title(n.get("title", ""))
+            if key in self._seen_set or key in keys:
+                continue
+            keys.add(key)
+            fresh.append(n)
+        return fresh
+
+    def advance(self, items):
+        for n in items:
+            key = _norm_title(n.get("title", ""))
+            if len(self.seen) == self.seen.maxlen:
+                self._seen_set.discard(self.seen[0])
+            self.seen.append(key)
+            self._seen_set.add(key)
+            if n.get("t", "") >= self.t:
+                self.t, self.title = n.get("t", ""), n.get("title", "")
+
+    def save(self):
+        _common._save_cache(self.path, {"t": self.t, "title": self.title, "seen": list(self.seen)})
+
+
+def follow(interval=FOLLOW_MIN, max_interval=FOLLOW_MAX, backlog=20, once=False, state_path=None):
+    """持续轮询快讯，逐条 yield 新出现的条目（旧到新）。
+
+    首次运行（无水位）先输出最新 backlog 条。每批条目全部交给调用方后才推进并保存水位，
+    中途退出时下次会重新输出这一批（至少一次）。轮询间隔在 [interval, max_interval] 间自适应：
+    有新快讯回到 interval，否则按 FOLLOW_BACKOFF 倍放宽。网络错误写 stderr 后按最长间隔重试。
+    once=True 时只轮询一次。
+
+    每次轮询都带 ETag 条件请求，无新数据时服务端只回 304。
+    """
+    mark = Watermark(state_path)
+    delay = interval
+    while True:
+        try:
+            data, _ = _fetch(refresh=True)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            if once:
+                return
+            delay = max_interval
+        else:
+            items = _items(data)
+            fresh = mark.delta(items if mark else items[:backlog])
+            for n in fresh:
+                yield n
+            if fresh or not mark:
+                mark.advance(fresh)
+                mark.save()
+            delay = interval if fresh else min(max_interval, delay * FOLLOW_BACKOFF)
+        if once:
+            return
+        time.sleep(delay)
 
 
 def fmt_news(items, limit=20):
@@ -51,17 +160,85 @@ def fmt_news(items, limit=20):
     return "\n".join(lines)
 
 
+def fmt_news_line(n):
+    t = n.get("t", "")
+    cat = n.get("cat", "")
+    tag = "[%s] " % cat if cat else ""
+    return "- `%s` %s%s" % (t.replace("T", " ")[:16], tag, n.get("title", ""))
+
+
+def _run_follow(flags, limit, fields=None, interval=None):
+    try:
+        interval = max(1.0, float(interval)) if interval else FOLLOW_MIN
+    except ValueError:
+        print("--interval 必须是秒数: %s" % interval, file=sys.stderr)
+        sys.exit(1)
+    use_jsonl = "--jsonl" in flags
+    try:
+        for n in follow(interval, max(interval, FOLLOW_MAX), backlog=limit, once="--once" in flags):
+            if use_jsonl:
+                write_json(n, fields=fields, jsonl=True)
+                sys.stdout.flush()
+            else:
+                print(fmt_news_line(n), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+def _limit(raw, default=20):
+    """条数参数：非整数时用默认值，小于 1（如 -5）报错退出，避免 items[:-5] 这样的切片。"""
+    try:
+        limit = int(raw) if raw else default
+    except ValueError:
+        return default
+    if limit < 1:
+        print("条数必须是正整数: %s" % raw, file=sys.stderr)
+        sys.exit(1)
+    return limit
+
+
+def _run_search(argv):
+    import _news_store
+
+    args, flags, options = parse_argv(argv, VALUE_OPTIONS + ("--cat", "--since", "--limit"))
+    query = " ".join(args)
+    if not query:
+        print("用法: news.py search <关键词> [--cat 分类] [--since YYYY-MM-DD] [--limit N]")
+        sys.exit(1)
+    limit = _limit(options.get("--limit"))
+    store = _news_store.load()
+    if not store:
+        print("本地快讯库为空，先运行 news.py 拉取快讯后再检索", file=sys.stderr)
+        sys.exit(1)
+    hits = store.search(query, cat=options.get("--cat"), since=options.get("--since"), limit=limit)
+    if "--json" in flags or "--jsonl" in flags:
+        fields, use_jsonl = output_options()
+        write_json(hits, fields=fields, jsonl=use_jsonl)
+    elif not hits:
+        print("本地 %d 条快讯中未找到「%s」" % (len(store), query))
+    else:
+        lines = ["# 快讯检索「%s」（本地 %d 条，命中 %d 条）" % (query, len(store), len(hits)), ""]
+        lines.extend(fmt_news_line(n) for n in hits)
+        print("\n".join(lines))
+
+
 def main():
-    args = [a for a in sys.argv[1:] if not a.startswith("-")]
-    flags = {a for a in sys.argv[1:] if a.startswith("-")}
-    use_json = "--json" in flags
+    if sys.argv[1:2] == ["search"]:
+        _run_search(sys.argv[2:])
+        return
 
-    limit = 20
-    if args:
-        try:
-            limit = int(args[0])
-        except ValueError:
-            pass
+    # --interval 30 与 --interval=30 等价，不能把 30 当成条数
+    args, flags, options = parse_argv(value_options=VALUE_OPTIONS + ("--interval",))
+    fields, use_jsonl = output_options()
+    use_json = "--json" in flags or use_jsonl
+
+    limit = _limit(args[0] if args else None)
+
+    # 跟踪模式是长时间运行的循环，不能交给守护进程串行处理
+    if "--follow" in flags:
+        _run_follow(flags, limit, fields, options.get("--interval"))
+        return
+    delegate_to_daemon("news")
 
     try:
         data, cached = _fetch()
@@ -69,11 +246,11 @@ def main():
         print(str(e), file=sys.stderr)
         sys.exit(1)
 
-    items = data if isinstance(data, list) else data.get("items", [])
+    items = _items(data)
     print_cache_hint(cached, "")
 
     if use_json:
-        print(json.dumps(items[:limit], ensure_ascii=False, indent=2))
+        write_json(items[:limit], fields=fields, jsonl=use_jsonl)
     else:
         print(fmt_news(items, limit))
 
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""缓存预热 — 按交易日历在盘后发布窗口拉取新数据，让之后的查询直接命中本地缓存。
+
+Usage:
+    python3 warmup.py            # 立即预热一次（强制刷新全部数据集）
+    python3 warmup.py --wait     # 等到下一个发布窗口，轮询到新数据发布后预热
+    python3 warmup.py next       # 查看下一个发布窗口
+
+建议配合 cron 在交易日傍晚运行，例如:
+    50 19 * * 1-5  python3 ~/.claude/skills/hhxg-market/scripts/warmup.py --wait
+
+数据来源: https://hhxg.top
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import _common
+from _common import NotFoundError, cache_ttl, extend_cache, fetch_json, fetch_many, is_published, load_script
+
+CST = timezone(timedelta(seconds=_common.TZ_OFFSET))
+POLL_BACKOFF = (30, 60, 120, 300, 600)   # 轮询间隔（秒），到末项后保持不变
+POLL_GIVE_UP = 4 * 3600                  # 发布窗口开始 4 小时后仍无新数据则放弃
+SNAPSHOT = ("assistant/skill_snapshot.json", "last.json")
+MARGIN = ("assistant/recent_margin_7d.json", "margin_7d.json")
+
+
+def _trading_calendar():
+    """按年懒加载的交易日历，跨年时自动拉取下一年。"""
+    cal = load_script("calendar")
+    return cal.TradingCalendar([], cal._load_trading_year)
+
+
+def next_publish_window(now=None, trading_days=None):
+    """返回下一个发布窗口的开始时间（北京时间 datetime）。
+
+    今天是交易日且尚未过发布宽限期时返回今天 PUBLISH_HOUR，否则顺延到下一个交易日。
+    交易日历不可用时退化为逐日顺延。
+    """
+    now = now or datetime.now(CST)
+    if trading_days is None:
+        days = _trading_calendar()
+    else:
+        days = load_script("calendar").TradingCalendar(trading_days)
+    day = now.date()
+    for _ in range(400):
+        start = datetime(day.year, day.month, day.day, _common.PUBLISH_HOUR, tzinfo=CST)
+        # 该年交易日历尚未发布时无法判断，按交易日处理
+        trading = not days.has_year(day.year) or days.is_trading(day.isoformat())
+        if trading and now < start + timedelta(
+            seconds=_common.PUBLISH_GRACE
+        ):
+            return start
+        day += timedelta(days=1)
+    return None
+
+
+def _generated_at(data):
+    return (data or {}).get("meta", {}).get("generated_at", "")
+
+
+def wait_for_publish(window_date, deadline):
+    """按退避间隔轮询日报快照，直到拿到 window_date 这一轮发布的数据。Returns 新数据或 None。"""
+    attempt = 0
+    while True:
+        try:
+            data, from_cache = fetch_json(*SNAPSHOT, refresh=True)
+            if not from_cache and is_published(data, window_date):
+                return data
+        except RuntimeError:
+            pass
+        delay = POLL_BACKOFF[min(attempt, len(POLL_BACKOFF) - 1)]
+        if time.time() + delay > deadline:
+            return None
+        time.sleep(delay)
+        attempt += 1
+
+
+def _requests():
+    """需要预热的数据集：融资融券、本月及下月解禁/业绩，以及这两个月所在年份的交割日、交易日历。"""
+    cal = load_script("calendar")
+    today = datetime.now(CST).date()
+    this_month = today.strftime("%Y-%m")
+    next_month = (today.replace(day=28) + timedelta(days=4)).strftime("%Y-%m")
+    reqs = [MARGIN]
+    for year in sorted({this_month[:4], next_month[:4]}):
+        reqs += [cal._trading_days_request(year), cal._events_request("delivery", year)]
+    for month in (this_month, next_month):
+        for kind in ("unlock", "earnings"):
+            reqs.append(cal._events_request(kind, month))
+    return reqs
+
+
+def prefetch(requests, published_on=None):
+    """强制刷新一组数据集。Returns (成功数, 跳过数)。
+
+    published_on 为已确认发布完毕的窗口日期（YYYY-MM-DD）时，缓存有效期直接延长到下一次发布，
+    跳过发布宽限期内的短 TTL；本次拉到的快照若不属于该轮发布则不延长，免得把旧数据钉到明天。
+    下月解禁/业绩、次年日历等尚未发布的文件（404）算作跳过，不算失败。
+    """
+    results = fetch_many(requests, refresh=True)
+    until = cache_ttl("", time.time() + _common.PUBLISH_GRACE)
+    ok = skipped = 0
+    for path, cache_name in requests:
+        result = results[path]
+        if isinstance(result, NotFoundError):
+            print("- %s 尚未发布，跳过" % path, file=sys.stderr)
+            skipped += 1
+            continue
+        if isinstance(result, RuntimeError) or result[1]:
+            print("- %s 预热失败" % path, file=sys.stderr)
+            continue
+        if published_on and (path != SNAPSHOT[0] or is_published(result[0], published_on)):
+            extend_cache(path, cache_name, until)
+        ok += 1
+    return ok, skipped
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("-")]
+    flags = {a for a in sys.argv[1:] if a.startswith("-")}
+
+    if args and args[0] == "next":
+        window = next_publish_window()
+        print("下一个发布窗口: %s" % (window.strftime("%Y-%m-%d %H:%M") if window else "未知"))
+        return
+
+    requests = [SNAPSHOT] + _requests()
+    published_on = None
+    if "--wait" in flags:
+        window = next_publish_window()
+        if window is None:
+            print("无法确定下一个发布窗口", file=sys.stderr)
+            sys.exit(1)
+        wait = (window - datetime.now(CST)).total_seconds()
+        if wait > 0:
+            print("等待发布窗口 %s ..." % window.strftime("%Y-%m-%d %H:%M"), file=sys.stderr)
+            time.sleep(wait)
+        window_date = window.date().isoformat()
+        data = wait_for_publish(window_date, window.timestamp() + POLL_GIVE_UP)
+        if data is None:
+            print("发布窗口内未检测到新数据", file=sys.stderr)
+            sys.exit(1)
+        print("新数据已发布: %s" % _generated_at(data))
+        published_on = window_date
+
+    ok, skipped = prefetch(requests, published_on)
+    total = len(requests) - skipped
+    print("已预热 %d/%d 个数据集%s" % (ok, total, "（%d 个尚未发布）" % skipped if skipped else ""))
+    if ok < total:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()